@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+import numpy as np
+
+class AcquisitionThread(threading.Thread):
+    """
+    Run a sample source on a worker thread and hand its batches to the GUI.
+
+    The source is called with the batch size and must return that many samples,
+    either as a 1-D array or as (channels, n) for several channels sampled together.
+    Batches go into a bounded queue; when the GUI falls behind and the queue is
+    full, new batches are dropped (and counted) instead of blocking acquisition.
+    """
+
+    def __init__(self, source, sample_rate=1000.0, batch_size=10, max_batches=100):
+        """
+        :param source: Callable source(n) -> array of n new samples, (n,) or (channels, n).
+        :param sample_rate: Target acquisition rate (samples per second).
+        :param batch_size: Samples produced per source call.
+        :param max_batches: Queue capacity in batches.
+        """
+        super().__init__(daemon=True)
+        self.source = source
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_batches)
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.produced = 0  # Samples accepted into the queue
+        self.dropped = 0  # Samples lost because the queue was full
+        self.queued = 0  # Samples waiting in the queue
+
+    def run(self):
+        period = self.batch_size / self.sample_rate
+        next_time = time.perf_counter()
+        while not self._stop_event.is_set():
+            batch = np.asarray(self.source(self.batch_size))
+            try:
+                self.queue.put_nowait(batch)
+                with self._lock:
+                    self.produced += batch.shape[-1]
+                    self.queued += batch.shape[-1]
+            except queue.Full:
+                with self._lock:
+                    self.dropped += batch.shape[-1]
+
+            # Keep the average rate; sleep only if we are ahead of schedule
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self._stop_event.wait(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def drain(self):
+        """
+        Take everything queued so far (call once per frame from the GUI thread).
+        :return: Samples in acquisition order, (n,) or (channels, n) like the
+                 source batches (an empty 1-D array if nothing was queued).
+        """
+        batches = []
+        while True:
+            try:
+                batches.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batches:
+            return np.empty(0)
+        samples = np.concatenate(batches, axis=-1)
+        with self._lock:
+            self.queued -= samples.shape[-1]
+        return samples
+
+    def stop(self, timeout=1.0):
+        """Ask the worker to finish and wait for it."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def counters(self):
+        """
+        :return: Dict with produced, dropped and queued sample counts.
+        """
+        with self._lock:
+            return {"produced": self.produced, "dropped": self.dropped, "queued": self.queued}
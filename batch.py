@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from filters import apply_notch_bank, StreamingNotch
+from stats import PowerAccumulator
+
+# === Анотация ===
+# Паралелен анализ (notch банка + мощност/RMS, както в meas5/meas6/meas8) на
+# много канали или записи с пул от процеси.
+# Каналите на голям масив се подават през multiprocessing.shared_memory – всеки
+# процес се свързва по име веднъж, а задачите са само номера на редове; записите
+# се отварят от самите процеси (np.memmap), без пренасяне на данни.
+# Всеки канал (или запис) се обработва изцяло от един процес, а частичните
+# резултати се сливат в реда на каналите/записите, затова резултатът е един и
+# същ (до бит) при произволен брой процеси.
+# Пример:
+#   python batch.py --fs 10000 --freqs 50,100,150 --processes 8 data/*.npy
+#   python batch.py --fs 10000 --dtype int16 --channels 4 --causal data/*.bin
+#   python batch.py --synthetic 64x1000000 --fs 10000 --scaling 8
+
+# --- Масив в споделена памет ---
+class SharedArray:
+    """
+    numpy масив върху multiprocessing.shared_memory. Към други процеси се
+    предава spec (име, форма, dtype), а не данните.
+    """
+
+    def __init__(self, shape, dtype=float, name=None):
+        """
+        name: None -> нов блок; иначе свързване към съществуващ блок с това име
+        """
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def copy_of(cls, array):
+        array = np.asarray(array)
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name)
+
+    def close(self):
+        """Освобождава блока; създалият го процес го и изтрива."""
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Анализ на един канал / запис ---
+def notch_channels(x, freqs, Q, fs, causal):
+    """
+    x: (канали, проби)
+    causal: False -> filtfilt банка (както в meas*); True -> причинен филтър
+    """
+    if not causal:
+        return apply_notch_bank(x, freqs, Q, fs)
+    notch = StreamingNotch(freqs, Q, fs, channels=len(x))
+    notch.reset(first=x[:, 0])
+    return notch.process(x)
+
+# Състояние на процеса в пула (задава се от _init_channels)
+_worker = {}
+
+def _init_channels(signal_spec, out_spec, params):
+    _worker["signals"] = SharedArray.attach(signal_spec)
+    _worker["out"] = SharedArray.attach(out_spec) if out_spec is not None else None
+    _worker["params"] = params
+
+def _channel_task(rows):
+    """Обработва редовете [start, stop) от споделения масив; връща акумулаторите им."""
+    start, stop = rows
+    x = _worker["signals"].array[start:stop]
+    y = notch_channels(x, **_worker["params"])
+    if _worker["out"] is not None:
+        _worker["out"].array[start:stop] = y
+    before = [PowerAccumulator().update(row) for row in x]
+    after = [PowerAccumulator().update(row) for row in y]
+    return before, after
+
+def _file_task(path, params, reader):
+    """Обработва един запис (в процес от пула); връща акумулаторите по канал."""
+    from recording import Recording
+    if reader.get("dtype"):
+        rec = Recording(path, **reader)
+    else:
+        rec = Recording.from_npy(path, reader["fs"], reader.get("scale", 1.0))
+    before = [PowerAccumulator() for _ in range(rec.channels)]
+    after = [PowerAccumulator() for _ in range(rec.channels)]
+    if params["causal"]:
+        from pipeline import Pipeline, NotchStage
+        chain = Pipeline(NotchStage(params["freqs"], params["Q"], params["fs"]), channels=rec.channels)
+        chunks = ((x, chain.process(x)) for _, x in rec.chunks(reader.get("chunk", 1 << 18)))
+    else:
+        x = rec.read()
+        chunks = [(x, notch_channels(x, **params))]
+    for x, y in chunks:
+        for acc, row in zip(before, x):
+            acc.update(row)
+        for acc, row in zip(after, y):
+            acc.update(row)
+    return before, after
+
+# --- Сливане на частичните резултати ---
+def merge_accumulators(parts):
+    """Слива акумулатори в дадения ред (детерминистично)."""
+    total = PowerAccumulator()
+    for acc in parts:
+        total.merge(acc)
+    return total
+
+def summarize(before, after):
+    """Обобщение: RMS по канал (или запис x канал) и общо за всички."""
+    return {
+        "rms_in": [acc.rms for acc in before],
+        "rms_out": [acc.rms for acc in after],
+        "total_rms_in": merge_accumulators(before).rms,
+        "total_rms_out": merge_accumulators(after).rms,
+    }
+
+def analyze_channels(signals, fs, freqs=(50, 100, 150), Q=30.0, causal=False,
+                     processes=None, rows_per_task=1, keep_output=False):
+    """
+    signals: (канали, проби) – копира се веднъж в споделена памет
+    processes: брой процеси (None -> os.cpu_count()); 1 -> без пул
+    rows_per_task: канали в една задача
+    keep_output: връща и филтрираните сигнали (през втори споделен блок)
+    """
+    signals = np.atleast_2d(np.asarray(signals, dtype=float))
+    params = {"freqs": tuple(freqs), "Q": Q, "fs": fs, "causal": causal}
+    tasks = [(i, min(i + rows_per_task, len(signals))) for i in range(0, len(signals), rows_per_task)]
+    start = time.perf_counter()
+    with SharedArray.copy_of(signals) as shared:
+        out = SharedArray(signals.shape) if keep_output else None
+        try:
+            out_spec = out.spec if out is not None else None
+            if processes == 1:
+                _init_channels(shared.spec, out_spec, params)
+                results = [_channel_task(rows) for rows in tasks]
+                _worker.clear()
+            else:
+                with ProcessPoolExecutor(processes, initializer=_init_channels,
+                                         initargs=(shared.spec, out_spec, params)) as pool:
+                    results = list(pool.map(_channel_task, tasks))  # В реда на задачите
+            filtered = out.array.copy() if out is not None else None
+        finally:
+            if out is not None:
+                out.close()
+    summary = summarize([a for before, _ in results for a in before],
+                        [a for _, after in results for a in after])
+    summary["seconds"] = time.perf_counter() - start
+    if keep_output:
+        summary["filtered"] = filtered
+    return summary
+
+def analyze_files(paths, fs, freqs=(50, 100, 150), Q=30.0, causal=False, processes=None, **reader):
+    """
+    paths: записи (.npy или сурови с reader['dtype'] – както recording.Recording)
+    Всеки запис се обработва от един процес; резултатите са по запис и канал.
+    """
+    params = {"freqs": tuple(freqs), "Q": Q, "fs": fs, "causal": causal}
+    reader = dict(reader, fs=fs)
+    start = time.perf_counter()
+    if processes == 1:
+        results = [_file_task(path, params, reader) for path in paths]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(pool.map(_file_task, paths, [params] * len(paths), [reader] * len(paths)))
+    files = [dict(summarize(before, after), input=str(path)) for path, (before, after) in zip(paths, results)]
+    summary = summarize([a for before, _ in results for a in before],
+                        [a for _, after in results for a in after])
+    summary["files"] = files
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+# --- Мащабиране по брой процеси ---
+def scaling_report(run, max_processes, repeat=1):
+    """
+    run(processes) -> обобщение със "seconds"; пуска се за 1 ... max_processes.
+    Връща редове с време, ускорение, ефективност и дали резултатът съвпада с
+    този при един процес.
+    """
+    rows = []
+    reference = None
+    for processes in range(1, max_processes + 1):
+        best = None
+        for _ in range(repeat):
+            summary = run(processes)
+            if best is None or summary["seconds"] < best["seconds"]:
+                best = summary
+        result = (best["rms_in"], best["rms_out"])
+        reference = result if reference is None else reference
+        base = rows[0]["seconds"] if rows else best["seconds"]
+        rows.append({"processes": processes, "seconds": best["seconds"],
+                     "speedup": base / best["seconds"],
+                     "efficiency": base / best["seconds"] / processes,
+                     "identical": result == reference})
+    return rows
+
+# --- Команден ред ---
+def parse_freqs(text):
+    return [float(f) for f in text.split(",") if f.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Паралелен notch + RMS анализ на много канали или записи.")
+    parser.add_argument("inputs", nargs="*", help=".npy или сурови записи (с --dtype)")
+    parser.add_argument("--fs", type=float, required=True, help="честота на дискретизация (Hz)")
+    parser.add_argument("--freqs", type=parse_freqs, default=[50.0, 100.0, 150.0], help="честоти, напр. 50,100,150")
+    parser.add_argument("--Q", type=float, default=30.0)
+    parser.add_argument("--causal", action="store_true", help="причинен филтър на парчета вместо filtfilt")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="брой процеси")
+    parser.add_argument("--scaling", type=int, metavar="N", help="отчет за 1 ... N процеса")
+    parser.add_argument("--repeat", type=int, default=1, help="--scaling: повторения; взима се най-бързото")
+    parser.add_argument("--synthetic", metavar="CxN", help="вместо записи: C канала по N проби (synth)")
+    parser.add_argument("--rows-per-task", type=int, default=1, help="--synthetic: канали в задача")
+    parser.add_argument("--dtype", help="суров запис с този тип проби")
+    parser.add_argument("--channels", type=int, default=1, help="канали в суровия запис")
+    parser.add_argument("--layout", choices=("interleaved", "planar"), default="interleaved")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--json", help="запис на обобщението/отчета (JSON)")
+    args = parser.parse_args(argv)
+    if not args.inputs and not args.synthetic:
+        parser.error("задайте записи или --synthetic")
+
+    if args.synthetic:
+        from synth import SignalGenerator
+        channels, samples = (int(float(v)) for v in args.synthetic.lower().split("x"))
+        signals = SignalGenerator(args.fs, channels=channels, seed=0)(samples)
+
+        def run(processes):
+            return analyze_channels(signals, args.fs, args.freqs, args.Q, args.causal,
+                                    processes, args.rows_per_task)
+    else:
+        reader = {"dtype": args.dtype, "channels": args.channels, "layout": args.layout,
+                  "scale": args.scale} if args.dtype else {"scale": args.scale}
+
+        def run(processes):
+            return analyze_files(args.inputs, args.fs, args.freqs, args.Q, args.causal, processes, **reader)
+
+    if args.scaling:
+        rows = scaling_report(run, args.scaling, args.repeat)
+        print(f"{'processes':>9} {'s':>9} {'speedup':>8} {'efficiency':>10} {'identical':>9}  (cpu_count={os.cpu_count()})")
+        for row in rows:
+            print(f"{row['processes']:>9} {row['seconds']:>9.3f} {row['speedup']:>8.2f} "
+                  f"{row['efficiency']:>10.2f} {str(row['identical']):>9}")
+        result = {"cpu_count": os.cpu_count(), "scaling": rows}
+    else:
+        result = run(args.processes)
+        print(json.dumps({k: v for k, v in result.items() if k != "files"}, ensure_ascii=False))
+        for f in result.get("files", []):
+            print(json.dumps(f, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=1, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,511 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from scipy import interpolate
+from scipy.signal import iirnotch, filtfilt, lfilter
+from filters import exponential_filter, MovingAverage, apply_notch_bank, StreamingNotch
+from lms import lms_filter, FrequencyDomainLMS, vector_lms_filter, MultichannelLMS
+from spectral import StreamingFFTNotch
+from triac import mask_triac_spikes, triac_mask, fill_gaps
+from graph2 import MagneticSensorSmoothing, BatchMagneticSensorSmoothing
+from synth import SignalGenerator
+from pipeline import Pipeline, TriacMaskStage, GapFillStage, NotchStage, PowerStage
+
+# === Анотация ===
+# Възпроизводим бенчмарк на филтрите от meas*/graph* и техните заместители.
+# За всеки случай се мерят проби в секунда (проби x канали) и пикова памет
+# (tracemalloc, в отделно пускане) при различни дължини, канали и параметри.
+# Пример:
+#   python bench.py --json base.json                  # 1e3 ... 1e6 проби
+#   python bench.py --max-n 1e8 --cases notch,lms     # до 1e8, само част от случаите
+#   python bench.py --baseline base.json              # сравнение с предишен резултат
+# Заместителите се сравняват и с оригиналните реализации (колона max |dy|).
+# При регресия (по-бавно от baseline с повече от --tolerance) или отклонение
+# над границата на проверката изходният код е 1.
+
+CHUNK = 1_000_000  # Поточните случаи подават дългите сигнали на парчета
+FS = 1000
+
+# --- Помощни функции ---
+def make_signal(n, channels=1, seed=0):
+    """Постоянна стойност + 50/100 Hz + шум; (n,) или (channels, n)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / FS
+    x = 1.0 + 0.3 * np.sin(2 * np.pi * 50 * t) + 0.2 * np.sin(2 * np.pi * 100 * t)
+    x = x + rng.normal(0, 0.05, size=(channels, n))
+    return x[0] if channels == 1 else x
+
+def references(n, freqs=(50, 100, 150)):
+    """Референтни синусоиди (n, M) за LMS."""
+    t = np.arange(n) / FS
+    return np.stack([np.sin(2 * np.pi * f * t) for f in freqs], axis=1)
+
+def streamed(process, n, channels=1):
+    """
+    Функция, която подава n проби (на канал) на парчета от CHUNK през process(парче).
+    Едно и също парче се използва многократно, за да не зависи паметта от n.
+    """
+    block = make_signal(min(n, CHUNK), channels)
+
+    def run():
+        done = 0
+        while done < n:
+            size = min(CHUNK, n - done)
+            process(block[..., :size])
+            done += size
+    return run
+
+def measure(run, repeat=1, memory=True):
+    """Връща (най-краткото време в секунди, пикова памет в байтове или None)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        # tracemalloc забавя numpy, затова паметта се мери в отделно пускане
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak
+
+# --- Референтни реализации (оригиналните от meas*) ---
+def exponential_loop(samples, alpha):
+    filtered = np.zeros_like(samples)
+    filtered[0] = samples[0]
+    for i in range(1, len(samples)):
+        filtered[i] = alpha * samples[i] + (1 - alpha) * filtered[i - 1]
+    return filtered
+
+def notch_cascade(sig, freqs, Q, fs):
+    for f in freqs:
+        b, a = iirnotch(f, Q, fs)
+        sig = filtfilt(b, a, sig)
+    return sig
+
+def fft_notch_whole(sig, fs, notch_freqs, width=1.0):
+    freqs = np.fft.rfftfreq(len(sig), d=1/fs)
+    spectrum = np.fft.rfft(sig)
+    for f in notch_freqs:
+        spectrum[np.abs(freqs - f) < width] = 0
+    return np.fft.irfft(spectrum, n=len(sig))
+
+def interpolate_nan(sig, t):
+    mask = np.isnan(sig)
+    f = interpolate.interp1d(t[~mask], sig[~mask], kind='linear', fill_value="extrapolate")
+    return f(t)
+
+def mask_triac_spikes_loop(sig, trigger_times, fs, window_ms=1):
+    """Оригиналната реализация с цикъл (от meas11/meas12) за сравнение."""
+    masked = sig.copy()
+    window_samples = int(window_ms * fs / 1000)
+    for t_trigger in trigger_times:
+        start = int(t_trigger * fs)
+        masked[start:start + window_samples] = np.nan
+    return masked
+
+def lms_mu(reference, taps):
+    return 0.1 / (taps * np.mean(reference ** 2) * taps ** 0.5)  # В стабилната област и за двата
+
+def signal_with_gaps(n):
+    x = make_signal(n)
+    x[triac_mask(np.arange(n // 10) / 100 + 0.002, FS, n)] = np.nan  # 100 момента в секунда
+    return x
+
+# --- Случаи ---
+# Всеки случай: функция(n, channels, **params) -> функция без аргументи за измерване.
+# Подготовката (сигнали, обекти) е извън измерването; n е брой проби на канал.
+
+def case_moving_average_convolve(n, channels, window):
+    x = make_signal(n)
+    kernel = np.ones(window) / window
+    return lambda: np.convolve(x, kernel, mode='valid')
+
+def case_moving_average_stream(n, channels, window):
+    ma = MovingAverage(window, mode='full')
+    return streamed(ma.process, n)
+
+def case_exponential_loop(n, channels, alpha):
+    x = make_signal(n)
+    return lambda: exponential_loop(x, alpha)
+
+def case_exponential_stream(n, channels, alpha):
+    state = {"zi": None}
+
+    def process(chunk):
+        _, state["zi"] = exponential_filter(chunk, alpha, state["zi"])
+    return streamed(process, n, channels)
+
+def case_notch_cascade(n, channels, Q):
+    x = make_signal(n, channels)
+    return lambda: notch_cascade(x, (50, 100, 150), Q, FS)
+
+def case_notch_bank(n, channels, Q):
+    x = make_signal(n, channels)
+    return lambda: apply_notch_bank(x, (50, 100, 150), Q, FS)
+
+def case_notch_stream(n, channels, Q):
+    notch = StreamingNotch((50, 100, 150), Q, FS, channels)
+    return streamed(lambda chunk: notch.process(chunk.reshape(channels, -1)), n, channels)
+
+def case_lms_loop(n, channels, taps):
+    d = make_signal(n)
+    x = d - d.mean()
+    mu = lms_mu(x, taps)
+    return lambda: lms_filter(x, d, mu, taps)
+
+def case_lms_fd(n, channels, taps):
+    x = make_signal(min(n, CHUNK))
+    x -= x.mean()
+    lms = FrequencyDomainLMS(taps, lms_mu(x, taps))
+    return streamed(lambda chunk: lms.process(x[:len(chunk)], chunk), n)
+
+def case_vector_lms_loop(n, channels):
+    X = references(n)
+    d = make_signal(n, channels).reshape(channels, n)
+
+    def run():
+        for c in range(channels):
+            vector_lms_filter(X, d[c])
+    return run
+
+def case_vector_lms_batched(n, channels, block_size):
+    X = references(min(n, CHUNK))
+    engine = MultichannelLMS(channels, X.shape[1], block_size=block_size)
+    return streamed(lambda chunk: engine.process(X[:chunk.shape[-1]], chunk.reshape(channels, -1)), n, channels)
+
+def case_fft_notch_whole(n, channels):
+    x = make_signal(n)
+    return lambda: fft_notch_whole(x, FS, (50, 100))
+
+def case_fft_notch_stream(n, channels, frame_size):
+    notch = StreamingFFTNotch((50, 100), FS, frame_size)
+    return streamed(notch.process, n)
+
+def case_interpolate_nan(n, channels):
+    x = signal_with_gaps(n)
+    t = np.arange(n) / FS
+    return lambda: interpolate_nan(x, t)
+
+def case_fill_gaps(n, channels, kind):
+    x = signal_with_gaps(n)
+    return lambda: fill_gaps(x.copy(), kind)
+
+def case_triac_mask_loop(n, channels):
+    x = make_signal(n)
+    triggers = np.arange(n // 10) / 100 + 0.002
+    return lambda: mask_triac_spikes_loop(x, triggers, FS)
+
+def case_triac_mask(n, channels):
+    x = make_signal(n)
+    triggers = np.arange(n // 10) / 100 + 0.002
+    return lambda: mask_triac_spikes(x, triggers, FS)
+
+def case_smoothing_update(n, channels):
+    x = make_signal(n).tolist()
+
+    def run():
+        smoother = MagneticSensorSmoothing(alpha=0.05)
+        for value in x:
+            smoother.update(value)
+    return run
+
+def case_smoothing_batch(n, channels, method):
+    x = make_signal(n, channels).reshape(channels, n)
+    return lambda: BatchMagneticSensorSmoothing(channels, 0.05, method).update(x)
+
+def case_synth(n, channels, threads):
+    generator = SignalGenerator(FS * 10, triac_rate=100, channels=channels, seed=0, threads=threads)
+    out = np.empty((channels, min(n, CHUNK)))
+
+    def run():
+        done = 0
+        while done < n:
+            size = min(CHUNK, n - done)
+            generator.generate(size, out[:, :size])
+            done += size
+    return run
+
+def case_pipeline(n, channels):
+    chain = Pipeline(TriacMaskStage(FS, offset=0.002), GapFillStage(), NotchStage((50, 100, 150), fs=FS),
+                     PowerStage(), channels=channels)
+    return streamed(lambda chunk: chain.process(chunk.reshape(channels, -1)), n, channels)
+
+# --- Проверки на точността ---
+# За всеки случай със заместител на оригинална реализация: функция(n, channels, **params)
+# -> (max |dy| спрямо оригинала, граница). Граница None – само за сведение (различен
+# алгоритъм, напр. блоков LMS или кубична интерполация), без проверка.
+CHECK_N = 20_000  # Проби на канал за проверката (или max_n на случая, ако е по-малко)
+CHECK_CHANNELS = 8  # Каналите са независими; с Python циклите на оригинала се сверяват първите 8
+
+def max_diff(a, b):
+    """max |a - b|; NaN трябва да са на едни и същи места (иначе inf)."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.shape != b.shape or not np.array_equal(np.isnan(a), np.isnan(b)):
+        return float("inf")
+    valid = ~np.isnan(a)
+    return float(np.abs(a[valid] - b[valid]).max()) if valid.any() else 0.0
+
+def split(x, parts=7):
+    """Неравни парчета по последната ос – за проверка на поточната обработка."""
+    edges = np.sort(np.random.default_rng(1).integers(0, x.shape[-1] + 1, parts - 1))
+    return np.split(x, edges, axis=-1)
+
+def check_moving_average_stream(n, channels, window):
+    x = make_signal(n)
+    ma = MovingAverage(window, mode='full')
+    y = np.concatenate([ma.process(chunk) for chunk in split(x)] + [ma.flush()])
+    return max_diff(y, np.convolve(x, np.ones(window) / window, mode='full')), 1e-9
+
+def check_exponential_stream(n, channels, alpha):
+    x = make_signal(n, channels).reshape(channels, n)
+    zi, parts = None, []
+    for chunk in split(x):
+        y, zi = exponential_filter(chunk, alpha, zi)
+        parts.append(y)
+    reference = np.stack([exponential_loop(row, alpha) for row in x])
+    return max_diff(np.concatenate(parts, axis=-1), reference), 1e-9
+
+def check_notch_bank(n, channels, Q):
+    # sosfiltfilt допълва краищата повече от filtfilt – сравнява се средната половина
+    x = make_signal(n, channels)
+    inner = slice(n // 4, n - n // 4)
+    y = apply_notch_bank(x, (50, 100, 150), Q, FS)[..., inner]
+    return max_diff(y, notch_cascade(x, (50, 100, 150), Q, FS)[..., inner]), 1e-5
+
+def check_notch_stream(n, channels, Q):
+    x = make_signal(n, channels).reshape(channels, n)
+    notch = StreamingNotch((50, 100, 150), Q, FS, channels)
+    y = np.concatenate([notch.process(chunk) for chunk in split(x)], axis=-1)
+    reference = x
+    for f in (50, 100, 150):
+        b, a = iirnotch(f, Q, FS)
+        reference = lfilter(b, a, reference)
+    return max_diff(y, reference), 1e-9
+
+def check_lms_fd(n, channels, taps):
+    # Както в оригиналното сравнение: разлика на изхода през последната секунда
+    t = np.arange(n) / FS
+    reference = 0.3 * np.sin(2 * np.pi * 50 * t) + 0.2 * np.sin(2 * np.pi * 100 * t) + 0.1 * np.sin(2 * np.pi * 150 * t)
+    measured = 1.0 + np.random.default_rng(0).normal(0, 0.05, n) + reference
+    mu = lms_mu(reference, taps)
+    _, y_ref = lms_filter(reference, measured, mu, taps)
+    _, y_fd = FrequencyDomainLMS(taps, mu).process(reference, measured)
+    tail = slice(max(len(y_fd) - FS, 0), len(y_fd))
+    return max_diff(y_fd[tail], y_ref[tail]), None  # Блоково обновяване – само за сведение
+
+def check_vector_lms_batched(n, channels, block_size):
+    X = references(n)
+    d = make_signal(n, channels).reshape(channels, n)
+    engine = MultichannelLMS(channels, X.shape[1], block_size=block_size)
+    parts, start = [], 0
+    for chunk in split(d):
+        parts.append(engine.process(X[start:start + chunk.shape[-1]], chunk)[0])
+        start += chunk.shape[-1]
+    e = np.concatenate(parts, axis=-1)
+    reference = np.stack([vector_lms_filter(X, row)[0] for row in d[:CHECK_CHANNELS]])
+    return max_diff(e[:CHECK_CHANNELS], reference), (1e-9 if block_size == 1 else None)
+
+def check_fft_notch_stream(n, channels, frame_size):
+    x = make_signal(n)
+    notch = StreamingFFTNotch((50, 100), FS, frame_size)
+    y = np.concatenate([notch.process(chunk) for chunk in split(x)] + [notch.flush()])
+    return max_diff(y, fft_notch_whole(x, FS, (50, 100))), None
+
+def check_fill_gaps(n, channels, kind):
+    x = signal_with_gaps(n)
+    reference = interpolate_nan(x, np.arange(n) / FS)
+    return max_diff(fill_gaps(x.copy(), kind), reference), (1e-9 if kind == 'linear' else None)
+
+def check_triac_mask(n, channels):
+    x = make_signal(n)
+    triggers = np.arange(n // 10) / 100 + 0.002
+    return max_diff(mask_triac_spikes(x, triggers, FS), mask_triac_spikes_loop(x, triggers, FS)), 0.0
+
+def check_smoothing_batch(n, channels, method):
+    x = make_signal(n, channels).reshape(channels, n)
+    y = BatchMagneticSensorSmoothing(channels, 0.05, method).update(x)
+    reference = np.empty((min(channels, CHECK_CHANNELS), n))
+    for c in range(len(reference)):
+        smoother = MagneticSensorSmoothing(alpha=0.05)
+        reference[c] = [smoother.update(value) for value in x[c]]
+    return max_diff(y[:len(reference)], reference), 1e-9
+
+def check_pipeline(n, channels):
+    x = make_signal(n, channels).reshape(channels, n)
+    chain = Pipeline(TriacMaskStage(FS, offset=0.002), GapFillStage(), NotchStage((50, 100, 150), fs=FS),
+                     PowerStage(), channels=channels)
+    y = np.concatenate([chain.process(chunk).copy() for chunk in split(x)] + [chain.flush()], axis=-1)
+    # Същото върху целия сигнал с функциите за цял масив
+    triggers = np.arange(0.002, n / FS, 1 / 100)  # Като в measure.py (TriacMaskStage дава същите)
+    filled = np.stack([fill_gaps(mask_triac_spikes(row, triggers, FS), 'linear') for row in x])
+    notch = StreamingNotch((50, 100, 150), 30.0, FS, channels)
+    notch.reset(first=filled[:, 0])
+    return max_diff(y, notch.process(filled)), 1e-9
+
+def check_synth(n, channels, threads):
+    def generator():
+        return SignalGenerator(FS * 10, triac_rate=100, channels=channels, seed=0, threads=threads)
+    whole = generator().generate(n)
+    chunked = generator()
+    y = np.concatenate([chunked.generate(chunk.shape[-1]) for chunk in split(np.empty((1, n)))], axis=-1)
+    return max_diff(y, whole), 1e-9
+
+CHECKS = {
+    "moving_average_stream": check_moving_average_stream,
+    "exponential_stream": check_exponential_stream,
+    "notch_bank": check_notch_bank,
+    "notch_stream": check_notch_stream,
+    "lms_fd": check_lms_fd,
+    "vector_lms_batched": check_vector_lms_batched,
+    "fft_notch_stream": check_fft_notch_stream,
+    "fill_gaps": check_fill_gaps,
+    "triac_mask": check_triac_mask,
+    "smoothing_batch": check_smoothing_batch,
+    "pipeline": check_pipeline,
+    "synth": check_synth,
+}
+
+# (име, функция, параметри, брой канали, максимално n на канал)
+# Python циклите и филтрите върху целия масив са ограничени по-ниско от поточните.
+CASES = [
+    ("moving_average_convolve", case_moving_average_convolve, {"window": (10, 1000, 10000)}, (1,), 1e7),
+    ("moving_average_stream", case_moving_average_stream, {"window": (10, 1000, 10000)}, (1,), 1e8),
+    ("exponential_loop", case_exponential_loop, {"alpha": (0.1,)}, (1,), 1e5),
+    ("exponential_stream", case_exponential_stream, {"alpha": (0.1,)}, (1, 8), 1e8),
+    ("notch_cascade", case_notch_cascade, {"Q": (10.0, 30.0, 100.0)}, (1, 8), 1e7),
+    ("notch_bank", case_notch_bank, {"Q": (10.0, 30.0, 100.0)}, (1, 8), 1e7),
+    ("notch_stream", case_notch_stream, {"Q": (30.0,)}, (1, 8, 64), 1e8),
+    ("lms_loop", case_lms_loop, {"taps": (16, 256)}, (1,), 1e5),
+    ("lms_fd", case_lms_fd, {"taps": (16, 256, 1024)}, (1,), 1e8),
+    ("vector_lms_loop", case_vector_lms_loop, {}, (1, 8), 1e5),
+    ("vector_lms_batched", case_vector_lms_batched, {"block_size": (1, 32)}, (1, 8, 64), 1e7),
+    ("fft_notch_whole", case_fft_notch_whole, {}, (1,), 1e7),
+    ("fft_notch_stream", case_fft_notch_stream, {"frame_size": (256, 2048)}, (1,), 1e8),
+    ("interpolate_nan", case_interpolate_nan, {}, (1,), 1e7),
+    ("fill_gaps", case_fill_gaps, {"kind": ("linear", "cubic")}, (1,), 1e7),
+    ("triac_mask_loop", case_triac_mask_loop, {}, (1,), 1e7),
+    ("triac_mask", case_triac_mask, {}, (1,), 1e8),
+    ("smoothing_update", case_smoothing_update, {}, (1,), 1e6),
+    ("smoothing_batch", case_smoothing_batch, {"method": ("exact", "lfilter")}, (1, 64, 512), 1e6),
+    ("pipeline", case_pipeline, {}, (1, 8), 1e8),
+    ("synth", case_synth, {"threads": (1, 4)}, (1, 8), 1e8),
+]
+
+def param_grid(grid):
+    combos = [{}]
+    for key, values in grid.items():
+        combos = [dict(combo, **{key: value}) for combo in combos for value in values]
+    return combos
+
+def record_key(record):
+    return (record["case"], json.dumps(record["params"], sort_keys=True), record["n"], record["channels"])
+
+def run_suite(sizes, selected=None, repeat=1, memory=True, check=True):
+    """
+    Генерира по един запис за всяка комбинация случай x параметри x канали x n.
+    check: за случаите от CHECKS записите носят и max_abs_diff/tolerance – от
+           една проверка на min(CHECK_N, max_n) проби за комбинацията параметри x канали.
+    """
+    for name, factory, grid, channel_counts, max_n in CASES:
+        if selected and not any(s in name for s in selected):
+            continue
+        for params in param_grid(grid):
+            for channels in channel_counts:
+                accuracy = {}
+                for n in sizes:
+                    if n > max_n:
+                        continue
+                    seconds, peak = measure(factory(n, channels, **params), repeat, memory)
+                    if check and name in CHECKS and not accuracy:
+                        diff, tolerance = CHECKS[name](int(min(CHECK_N, max_n)), channels, **params)
+                        accuracy = {"max_abs_diff": diff, "tolerance": tolerance}
+                    yield dict({"case": name, "params": params, "n": n, "channels": channels,
+                                "seconds": seconds, "samples_per_s": n * channels / seconds,
+                                "peak_bytes": peak}, **accuracy)
+
+# --- Отчет ---
+def compare(record, baseline, tolerance):
+    """Отношение на скоростта спрямо baseline (None, ако го няма) и дали е регресия."""
+    old = baseline.get(record_key(record))
+    if old is None:
+        return None, False
+    ratio = record["samples_per_s"] / old["samples_per_s"]
+    return ratio, ratio < 1 - tolerance
+
+def inaccurate(record):
+    """True, ако заместителят се отклонява от оригинала повече от границата."""
+    tolerance = record.get("tolerance")
+    return tolerance is not None and not record["max_abs_diff"] <= tolerance
+
+def format_record(record, ratio=None, regression=False, with_baseline=False):
+    params = ",".join(f"{k}={v}" for k, v in record["params"].items())
+    peak = f"{record['peak_bytes'] / 1e6:>9.1f}" if record["peak_bytes"] is not None else f"{'-':>9}"
+    diff = f"{record['max_abs_diff']:>9.1e}" if "max_abs_diff" in record else f"{'-':>9}"
+    line = (f"{record['case']:<24} {params:<16} {record['channels']:>4} {record['n']:>8.0e} "
+            f"{record['samples_per_s'] / 1e6:>10.3f} {peak} {diff}")
+    if inaccurate(record):
+        line += "  INACCURATE"
+    if with_baseline:
+        line += f" {'new':>8}" if ratio is None else f" {ratio:>7.2f}x"
+        if regression:
+            line += "  REGRESSION"
+    return line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк на филтрите.")
+    parser.add_argument("--min-n", type=float, default=1e3, help="най-малка дължина (проби на канал)")
+    parser.add_argument("--max-n", type=float, default=1e6, help="най-голяма дължина; до 1e8 за пълния обхват")
+    parser.add_argument("--cases", help="части от имената на случаите, разделени със запетая")
+    parser.add_argument("--repeat", type=int, default=3, help="повторения; взима се най-бързото")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="без измерване на паметта")
+    parser.add_argument("--no-check", dest="check", action="store_false",
+                        help="без сравнение на точността с оригиналните реализации")
+    parser.add_argument("--json", help="запис на резултатите (JSON)")
+    parser.add_argument("--baseline", help="предишен JSON за сравнение")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустим спад спрямо baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    exponents = np.arange(np.log10(args.min_n), np.log10(args.max_n) + 1e-9)
+    sizes = [int(round(10 ** e)) for e in exponents]
+    selected = args.cases.split(",") if args.cases else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {record_key(r): r for r in json.load(f)["results"]}
+
+    header = f"{'case':<24} {'params':<16} {'ch':>4} {'N':>8} {'MS/s':>10} {'peak MB':>9} {'max |dy|':>9}"
+    print(header + (f" {'vs base':>8}" if baseline is not None else ""))
+    results = []
+    regressions = 0
+    failures = 0
+    for record in run_suite(sizes, selected, args.repeat, args.memory, args.check):
+        ratio, regression = compare(record, baseline, args.tolerance) if baseline is not None else (None, False)
+        if ratio is not None:
+            record["baseline_ratio"] = ratio
+        regressions += regression
+        failures += inaccurate(record)
+        results.append(record)
+        print(format_record(record, ratio, regression, baseline is not None), flush=True)
+
+    if args.json:
+        meta = {"python": platform.python_version(), "numpy": np.__version__,
+                "machine": platform.machine(), "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "sizes": sizes}
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1)
+    if regressions:
+        print(f"{regressions} регресии спрямо {args.baseline}")
+    if failures:
+        print(f"{failures} записа с отклонение от оригиналната реализация над границата")
+    return 1 if regressions or failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
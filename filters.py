@@ -0,0 +1,252 @@
+from functools import lru_cache
+import numpy as np
+from scipy.signal import lfilter, iirnotch, sosfilt, sosfilt_zi, sosfiltfilt
+
+# --- Експоненциален филтър (IIR от първи ред) ---
+def exponential_filter(samples, alpha=0.1, zi=None):
+    """
+    samples: входни проби (времето е последната ос)
+    alpha: коефициент на изглаждане (0 < alpha <= 1)
+    zi: състояние от предишно извикване; None -> филтърът започва от първата проба
+    Връща (filtered, zf). zf се подава като zi за следващото парче, така че
+    обработката на парчета дава същия резултат като целия сигнал наведнъж.
+    """
+    samples = np.asarray(samples, dtype=float)
+    # y[n] = alpha * x[n] + (1 - alpha) * y[n-1]
+    b = [alpha]
+    a = [1.0, alpha - 1.0]
+    if samples.shape[-1] == 0:
+        # lfilter връща невалидно състояние при празен вход
+        return samples.copy(), zi
+    if zi is None:
+        # y[0] = x[0], както в оригиналния цикъл
+        zi = (1 - alpha) * samples[..., :1]
+    return lfilter(b, a, samples, axis=-1, zi=zi)
+
+# --- Движещо се средно с текуща сума ---
+class MovingAverage:
+    """
+    Поточно движещо се средно: O(1) на проба независимо от прозореца.
+    Пази текуща сума и кръгов буфер с последните window_size проби; за всяка
+    нова проба sum += x_new - x_old (векторно за цялото парче – работата е
+    пропорционална на новите проби, не на прозореца). На всеки renorm_interval
+    проби сумата се смята наново от буфера, за да не се натрупва грешка при
+    закръгляне в дълги потоци.
+    mode: 'valid', 'same' или 'full' – подравняване като при np.convolve;
+          изходът на process() е закъснял, а останалите проби дава flush().
+    Поток, по-къс от window_size, дава при 'same' и 'valid' друга дължина от
+    np.convolve (тя разменя сигнала и прозореца; потокът не знае дължината си
+    предварително) – за цял сигнал виж moving_average_filter. Празен поток
+    дава празен изход при всеки mode.
+    """
+
+    def __init__(self, window_size=5, mode='valid', renorm_interval=65536):
+        if mode not in ('valid', 'same', 'full'):
+            raise ValueError(f"Непознат режим: {mode}")
+        if window_size < 1:
+            raise ValueError("window_size трябва да е поне 1")
+        self.window_size = window_size
+        self.mode = mode
+        self.renorm_interval = max(renorm_interval, window_size)
+        self.reset()
+
+    def reset(self):
+        """Започва нов поток."""
+        W = self.window_size
+        self._ring = np.zeros(W)  # Последните W входни проби (нули преди началото), кръгово
+        self._pos = 0  # Индекс на най-старата проба в _ring
+        self._sum = 0.0  # Сума на _ring
+        self._since_renorm = 0  # Проби от последното преизчисляване на сумата
+        self._skip = {'valid': W - 1, 'same': (W - 1) // 2, 'full': 0}[self.mode]
+        self._n_in = 0
+        self._n_out = 0
+
+    def _causal(self, x):
+        W = self.window_size
+        out = np.empty(len(x))
+        start = 0
+        while start < len(x):
+            block = x[start:start + self.renorm_interval - self._since_renorm]
+            n = len(block)
+            k = min(n, W)
+            # Пробите, които напускат прозореца: първо от буфера, после от самото парче
+            leaving = np.empty(n)
+            leaving[:k] = self._ring[(self._pos + np.arange(k)) % W]
+            leaving[k:] = block[:n - k]
+            sums = out[start:start + n]
+            np.subtract(block, leaving, out=sums)
+            np.cumsum(sums, out=sums)
+            sums += self._sum
+            self._sum = sums[-1]
+
+            # Последните k проби заместват най-старите в буфера
+            self._ring[(self._pos + n - k + np.arange(k)) % W] = block[n - k:]
+            self._pos = (self._pos + n) % W
+            self._since_renorm += n
+            if self._since_renorm >= self.renorm_interval:
+                self._sum = self._ring.sum()
+                self._since_renorm = 0
+            sums /= W
+            start += n
+        return out
+
+    def _emit(self, y):
+        skip = min(self._skip, len(y))
+        self._skip -= skip
+        y = y[skip:]
+        self._n_out += len(y)
+        return y
+
+    def process(self, samples):
+        """
+        samples: следващото парче от потока (1-D)
+        Връща готовите изходни проби (може да са по-малко от входните).
+        """
+        samples = np.asarray(samples, dtype=float)
+        self._n_in += len(samples)
+        return self._emit(self._causal(samples))
+
+    def flush(self):
+        """Връща оставащите изходни проби в края на потока и започва нов поток."""
+        W = self.window_size
+        total = {'valid': max(self._n_in - W + 1, 0), 'same': self._n_in, 'full': self._n_in + W - 1}[self.mode]
+        total = total if self._n_in else 0
+        y = self._emit(self._causal(np.zeros(W - 1)))
+        y = y[:max(total - (self._n_out - len(y)), 0)]
+        self.reset()
+        return y
+
+def moving_average_filter(samples, window_size=5, mode='valid'):
+    """
+    Движещо се средно на цял сигнал (същото като np.convolve със същия mode,
+    включително дължината при сигнал, по-къс от прозореца). Празен сигнал дава
+    празен изход (np.convolve вдига ValueError).
+    """
+    samples = np.asarray(samples, dtype=float)
+    if mode not in ('valid', 'same', 'full'):
+        raise ValueError(f"Непознат режим: {mode}")
+    if len(samples) == 0:
+        return samples.copy()
+    ma = MovingAverage(window_size, 'full')
+    full = np.concatenate((ma.process(samples), ma.flush()))
+    # Изрязване като np.convolve, която поставя по-дългия масив първи
+    longer, shorter = max(len(samples), window_size), min(len(samples), window_size)
+    if mode == 'same':
+        return full[(shorter - 1) // 2:(shorter - 1) // 2 + longer]
+    if mode == 'valid':
+        return full[shorter - 1:longer]
+    return full
+
+# --- Банка notch филтри (каскада от секции от втори ред) ---
+@lru_cache(maxsize=64)
+def _notch_bank_sos(freqs, Q, fs):
+    # Всеки ред е [b0, b1, b2, a0, a1, a2]; sosfilt изисква масив с право на запис
+    return np.array([np.concatenate(iirnotch(f, Q, fs)) for f in freqs])
+
+def notch_bank_sos(freqs, Q=30.0, fs=1000):
+    """
+    freqs: честоти за потискане (Hz), напр. [50, 100, 150]
+    Q: качествен фактор, общ за всички notch филтри
+    fs: честота на дискретизация (Hz)
+    Връща sos масив (секция за всяка честота); кешира се по (freqs, Q, fs),
+    затова резултатът е общ и не трябва да се променя.
+    """
+    return _notch_bank_sos(tuple(float(f) for f in freqs), float(Q), float(fs))
+
+def apply_notch_bank(sig, freqs, Q=30.0, fs=1000):
+    """
+    Премахва всички честоти с едно нулевофазово sos преминаване (вместо filtfilt за всяка).
+    sig: сигнал (времето е последната ос)
+    """
+    return sosfiltfilt(notch_bank_sos(freqs, Q, fs), sig, axis=-1)
+
+# --- Notch банка в реално време ---
+class StreamingNotch:
+    """
+    Причинен (еднопосочен) notch филтър за поток, за един или много канала.
+    Състоянието на секциите се пази между блоковете, затова блоковете могат да са
+    произволно малки (и по една проба) и резултатът не зависи от разделянето им.
+    Закъснението е това на самия IIR филтър – без буфериране на блокове.
+    Блокове по-къси от small_block се смятат проба по проба в пространство на
+    състоянията (една матрична стъпка за всички канали и секции), защото
+    постоянните разходи на sosfilt на извикване са десетки микросекунди.
+    """
+
+    small_block = 32
+
+    def __init__(self, freqs, Q=30.0, fs=1000, channels=1):
+        """
+        freqs: честоти за потискане (Hz)
+        channels: брой канали, обработвани заедно
+        """
+        self.sos = notch_bank_sos(freqs, Q, fs)
+        self.channels = channels
+        # Състояние: (канали, секции, 2)
+        self.state = np.zeros((channels, len(self.sos), 2))
+        self._A, self._B, self._C, self._D = self._step_matrices(self.sos)
+
+    @staticmethod
+    def _step_matrices(sos):
+        """
+        Една стъпка на каскадата е линейна по (състояние, вход):
+        z' = z @ A + x * B,  y = z @ C + x * D  (z е (секции*2) вектор).
+        """
+        sections = len(sos)
+
+        def step(z, x):
+            z = z.reshape(sections, 2)
+            z_new = np.empty((sections, 2))
+            u = x
+            for i, (b0, b1, b2, _, a1, a2) in enumerate(sos):
+                y = b0 * u + z[i, 0]
+                z_new[i, 0] = b1 * u - a1 * y + z[i, 1]
+                z_new[i, 1] = b2 * u - a2 * y
+                u = y
+            return z_new.ravel(), u
+
+        responses = [step(e, 0.0) for e in np.eye(2 * sections)]
+        A = np.array([r[0] for r in responses])
+        C = np.array([r[1] for r in responses])
+        B, D = step(np.zeros(2 * sections), 1.0)
+        return A, B, C, D
+
+    def reset(self, first=None):
+        """
+        first: None -> нулево състояние; иначе стойност(и) по канал, за които
+               филтърът започва в установен режим (без преходен процес в началото)
+        """
+        if first is None:
+            self.state[:] = 0.0
+        else:
+            first = np.broadcast_to(np.asarray(first, dtype=float), (self.channels,))
+            self.state[:] = sosfilt_zi(self.sos)[np.newaxis] * first[:, np.newaxis, np.newaxis]
+
+    def process(self, block):
+        """
+        block: (channels, samples), или (samples,) при един канал
+        Връща филтрирания блок със същата форма.
+        """
+        block = np.asarray(block, dtype=float)
+        single = block.ndim == 1
+        if single:
+            block = block[np.newaxis]
+        if block.shape[0] != self.channels:
+            raise ValueError(f"Очаквани {self.channels} канала, получени {block.shape[0]}")
+        if block.shape[1] == 0:
+            return block[0].copy() if single else block.copy()
+        if block.shape[1] < self.small_block:
+            out = self._process_small(block)
+            return out[0] if single else out
+        # sosfilt иска състоянието като (секции, канали, 2)
+        out, zf = sosfilt(self.sos, block, axis=-1, zi=self.state.transpose(1, 0, 2))
+        self.state[:] = zf.transpose(1, 0, 2)
+        return out[0] if single else out
+
+    def _process_small(self, block):
+        z = self.state.reshape(self.channels, -1)  # Изглед, записва се директно в self.state
+        out = np.empty_like(block)
+        for n in range(block.shape[1]):
+            x = block[:, n]
+            out[:, n] = z @ self._C + x * self._D
+            z[:] = z @ self._A + x[:, np.newaxis] * self._B
+        return out
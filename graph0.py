@@ -3,49 +3,80 @@ import matplotlib
 matplotlib.use('QtAgg')  # Use the QtAgg backend for PyQt6
 import matplotlib.pyplot as plt
 import numpy as np
-from collections import deque
 import time
+from ringbuffer import RingBuffer
+from scheduler import FrameScheduler
 from PyQt6.QtWidgets import QApplication
 
 # Parameters
-N = 50  # Number of records to display
-update_interval = 0.1  # Time interval between updates (seconds)
+N = 5000  # Number of records to display (0.5 s at sample_rate)
+plot_points = 1000  # Points drawn: min and max of each of plot_points / 2 equal buckets of the N records
+sample_rate = 10000.0  # Simulated acquisition rate (samples per second), independent of the frame rate
+target_fps = 60.0  # Frame rate aimed for
+min_fps = 30.0  # Frame rate below which the report warns
+fps_report_interval = 2.0  # Seconds between FPS reports
 
 # Initialize data storage
-data = deque([0] * N, maxlen=N)  # A fixed-length deque to store the last N records
-x = np.arange(N)  # X-axis indices
+data = RingBuffer(N)  # A fixed-length buffer with the last N records and their min/max
+x = np.linspace(0, N - 1, plot_points)  # X-axis positions of the drawn points
+envelope = np.empty((plot_points // 2, 2))  # Min/max per bucket, drawn as one line
+
+def decimate(values):
+    """Reduce the records to plot_points, keeping the extremes of every bucket (spikes stay visible)."""
+    buckets = values.reshape(plot_points // 2, -1)
+    np.min(buckets, axis=1, out=envelope[:, 0])
+    np.max(buckets, axis=1, out=envelope[:, 1])
+    return envelope.ravel()
 
 # Set up the plot
 plt.ion()
 fig, ax = plt.subplots()
-line, = ax.plot(x, data)
+line, = ax.plot(x, decimate(data.view()))
 ax.set_ylim(-1, 1)  # Adjust based on the range of generated data
 ax.set_title("Real-Time Data Plot")
 ax.set_xlabel("Time (Relative Index)")
 ax.set_ylabel("Value")
 
-def generate_data():
-    """Simulate real-time data generation."""
-    return np.sin(time.time()) + np.random.normal(scale=0.1)
+def generate_batch(t):
+    """Simulate the samples taken at the times t (seconds)."""
+    return np.sin(t) + np.random.normal(scale=0.1, size=len(t))
 
 # Create a PyQt6 application instance
 app = QApplication(sys.argv)
+plt.show(block=False)
+
+scheduler = FrameScheduler(target_fps, min_fps)
+start = time.perf_counter()
+produced = 0  # Samples generated so far
+report_start, report_frames = start, 0
+
+def draw_frame():
+    """Add every sample due since the last frame and redraw."""
+    global produced
+    due = int((time.perf_counter() - start) * sample_rate)
+    data.extend(generate_batch(time.time() + (np.arange(produced, due) - due) / sample_rate))
+    produced = due
+
+    # Update the line plot
+    line.set_ydata(decimate(data.view()))
+    ax.set_ylim(data.min() - 0.1, data.max() + 0.1)  # Dynamic Y-axis scaling if needed
+    fig.canvas.draw()  # Synchronous, so the scheduler measures the real draw time
 
 # Update the plot in real time
 try:
     while True:
-        # Generate and append new data
-        new_value = generate_data()
-        data.append(new_value)
-
-        # Update the line plot
-        line.set_ydata(data)
-        ax.set_ylim(min(data) - 0.1, max(data) + 0.1)  # Dynamic Y-axis scaling if needed
-        plt.draw()
-        plt.pause(update_interval)
+        delay = scheduler.frame(draw_frame)
 
-        # Handle PyQt6 events
+        # Handle PyQt6 events until the next frame is due
+        fig.canvas.start_event_loop(max(delay, 0.001))
         app.processEvents()
 
+        report_frames += 1
+        now = time.perf_counter()
+        if now - report_start >= fps_report_interval:
+            print(f"{report_frames / (now - report_start):.1f} FPS, {sample_rate:.0f} samples/s "
+                  f"({scheduler.status()})")
+            report_start, report_frames = now, 0
+
 except KeyboardInterrupt:
     print("Real-time plotting stopped.")
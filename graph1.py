@@ -2,38 +2,149 @@ import sys
 import matplotlib
 matplotlib.use('QtAgg')  # Use the QtAgg backend for PyQt6
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
-from collections import deque
 import time
+from ringbuffer import MultiChannelRingBuffer
+from acquisition import AcquisitionThread
+from ingest import IngestThread
+from scheduler import FrameScheduler
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton
 from PyQt6.QtCore import QTimer
 
 # Parameters
-N = 200  # Number of records to display
-update_interval = 100  # Time interval between updates (milliseconds)
-
-# Initialize data storage
-data = deque([0] * N, maxlen=N)  # A fixed-length deque to store the last N records
+N = 2000  # Number of records to display (0.2 s at sample_rate)
+channels = 16  # Number of sensor channels shown (16-64)
+channel_spacing = 2.5  # Vertical offset between channel baselines (one shared Y axis)
+target_fps = 60.0  # Frame rate aimed for, independent of the sample rate
+min_fps = 30.0  # Frame rate below which the FPS report warns
+use_blit = True  # Redraw only the line on a cached background instead of the whole figure
+ylim_margin = 0.1  # Space kept between the data and the Y-axis limits
+ylim_hysteresis = 0.25  # Extra band (fraction of the data range) before the Y-axis is rescaled
+fps_report_interval = 2.0  # Seconds between FPS reports
+sample_rate = 10000.0  # Acquisition rate of the worker thread (samples per second)
+batch_size = 100  # Samples produced per worker iteration
+queue_batches = 200  # Batches buffered between the worker and the GUI before dropping
+# Devices plotted instead of the simulated source, as (stream spec, channels); see ingest.py,
+# e.g. [("unix:/tmp/sensor0.sock", 8), ("tcp:127.0.0.1:9000", 8), ("pipe:/tmp/sensor1.fifo", 4)]
+device_streams = []
+if device_streams:
+    channels = sum(count for _, count in device_streams)
+
+# Initialize data storage: one buffer per source (the simulated one or each device), with the
+# rows it fills; every buffer keeps the last N records of its channels, one row per channel
+source_channels = [count for _, count in device_streams] or [channels]
+bounds = np.cumsum([0] + source_channels)
+feeds = [(slice(lo, hi), MultiChannelRingBuffer(hi - lo, N)) for lo, hi in zip(bounds[:-1], bounds[1:])]
 x = np.arange(N)  # X-axis indices
+offsets = channel_spacing * np.arange(channels)  # Baseline of each channel
+
+# Vertices of all channel traces, (channels, N, 2); the X column never changes
+segments = np.empty((channels, N, 2))
+segments[:, :, 0] = x
+segments[:, :, 1] = offsets[:, np.newaxis]
 
-# Set up the plot
+# Set up the plot: all channels are one artist, stacked by offset on a single axis
 plt.ion()
 fig, ax = plt.subplots()
-line, = ax.plot(x, data)
-ax.set_ylim(-1, 1)  # Adjust based on the range of generated data
+colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+lines = LineCollection(segments, colors=colors, linewidths=0.8)
+ax.add_collection(lines)
+ax.set_xlim(0, N - 1)
+ax.set_ylim(-channel_spacing, channels * channel_spacing)
+ax.set_yticks(offsets, [f"ch{c}" for c in range(channels)], fontsize="x-small")
 ax.set_title("Real-Time Data Plot")
 ax.set_xlabel("Time (Relative Index)")
 ax.set_ylabel("Value")
 
+class BlitRenderer:
+    """Redraw only the animated artists on top of a cached figure background."""
+
+    def __init__(self, ax, artists, margin=0.1, hysteresis=0.25):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.artists = artists
+        self.margin = margin
+        self.hysteresis = hysteresis
+        self.background = None
+        for artist in artists:
+            artist.set_animated(True)  # Excluded from normal draws, drawn by us after blitting
+        # Every full draw (first show, resize, rescale) refreshes the cached background
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def needs_rescale(self, lo, hi):
+        """True if the data left the current limits or shrank well inside them."""
+        ymin, ymax = self.ax.get_ylim()
+        if lo < ymin or hi > ymax:
+            return True
+        fitted = (hi - lo) * (1 + 2 * self.hysteresis) + 2 * self.margin
+        return (ymax - ymin) > fitted * (1 + 2 * self.hysteresis)
+
+    def rescale(self, lo, hi):
+        band = (hi - lo) * self.hysteresis + self.margin
+        self.ax.set_ylim(lo - band, hi + band)
+
+    def update(self, lo, hi):
+        """Draw one frame for data spanning [lo, hi]."""
+        if self.background is None or self.needs_rescale(lo, hi):
+            # Ticks and labels change, so a full draw is needed; on_draw recaptures the background
+            self.rescale(lo, hi)
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_artists()
+            self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+class FpsCounter:
+    """Count frames and report the achieved frame rate periodically."""
+
+    def __init__(self, label, report_interval=2.0, status=None):
+        self.label = label
+        self.report_interval = report_interval
+        self.status = status  # Optional callable returning extra text for the report
+        self.frames = 0
+        self.frame_time = 0.0  # Seconds spent producing the frames of this report
+        self.start = time.perf_counter()
+        self.fps = 0.0
+        self.ms_per_frame = 0.0
+
+    def tick(self, frame_time=None):
+        """Count one frame; frame_time is the time it took to update and draw (seconds)."""
+        self.frames += 1
+        if frame_time is not None:
+            self.frame_time += frame_time
+        now = time.perf_counter()
+        elapsed = now - self.start
+        if elapsed >= self.report_interval:
+            self.fps = self.frames / elapsed
+            self.ms_per_frame = 1000 * self.frame_time / self.frames
+            timing = f", {self.ms_per_frame:.2f} ms/frame" if self.frame_time else ""
+            extra = f" ({self.status()})" if self.status is not None else ""
+            print(f"{self.label}: {self.fps:.1f} FPS{timing}{extra}")
+            self.frames = 0
+            self.frame_time = 0.0
+            self.start = now
+
 iteration = 0.0
-step = 0.09
+step = 2 * np.pi * 5 / sample_rate  # A 5 Hz simulated signal at any sample rate
 scale = 0.01
-def generate_data():
-    global iteration,scale, step
-    """Simulate real-time data generation."""
-
-    ret = np.sin(iteration) + np.random.normal(scale=scale)
-    iteration += step
+channel_phase = np.linspace(0, np.pi, channels, endpoint=False)  # Phase shift between the sensors
+
+def generate_batch(n):
+    """Simulate n consecutive samples of every channel at once (runs on the acquisition thread)."""
+    global iteration, scale, step
+    phases = iteration + step * np.arange(n) + channel_phase[:, np.newaxis]
+    ret = np.sin(phases) + np.random.normal(scale=scale, size=(channels, n))
+    iteration += step * n
     return ret
 
 # PyQt6 application setup
@@ -51,40 +162,94 @@ layout.addWidget(start_button)
 layout.addWidget(stop_button)
 window.setLayout(layout)
 
-# Timer for updating the plot
+# Timer for updating the plot: single-shot, re-armed by the scheduler after every frame
 timer = QTimer()
-timer.setInterval(update_interval)
+timer.setSingleShot(True)
+scheduler = FrameScheduler(target_fps, min_fps)
 
-def update_plot():
-    """Update the plot with new data."""
-    new_value = generate_data()
-    data.append(new_value)
+renderer = BlitRenderer(ax, [lines], margin=ylim_margin, hysteresis=ylim_hysteresis) if use_blit else None
+acquisition = None  # AcquisitionThread (simulated source) or IngestThread (devices)
+sources = []  # One drain()-able source per entry of feeds
+
+def acquisition_status():
+    if acquisition is None:
+        return "acquisition stopped"
+    counters = acquisition.counters()
+    return f"queued {counters['queued']}, dropped {counters['dropped']}, {scheduler.status()}"
 
-    # Update the line plot
-    line.set_ydata(data)
-    ax.set_ylim(min(data) - 0.1, max(data) + 0.1)  # Dynamic Y-axis scaling if needed
-    plt.draw()
+fps_counter = FpsCounter(f"{channels} channels, {'blit' if use_blit else 'full draw'}",
+                         fps_report_interval, acquisition_status)
+
+def update_plot():
+    """Update all channels with everything acquired since the last frame, in one draw."""
+    frame_start = time.perf_counter()
+    updated = False
+    for (rows, buffer), source in zip(feeds, sources):
+        new_values = source.drain()
+        if new_values.size == 0:
+            continue
+        buffer.extend(new_values)
+        # One vectorized update of all traces of this source
+        np.add(buffer.view(), offsets[rows, np.newaxis], out=segments[rows, :, 1])
+        updated = True
+    if not updated:
+        return
+
+    # One artist to redraw for all channels
+    lines.set_segments(segments)
+    lo = segments[:, :, 1].min()
+    hi = segments[:, :, 1].max()
+    if renderer is not None:
+        renderer.update(lo, hi)
+    else:
+        ax.set_ylim(lo - ylim_margin, hi + ylim_margin)  # Dynamic Y-axis scaling if needed
+        fig.canvas.draw()  # Synchronous, so the scheduler measures the real draw time
+    fps_counter.tick(time.perf_counter() - frame_start)
+
+def on_frame():
+    """Draw a frame and arm the timer for the next one."""
+    delay = scheduler.frame(update_plot)
+    timer.start(max(round(1000 * delay), 1))  # At least 1 ms for the other Qt events
 
 # Button actions
 def start_generation():
     """Start data generation."""
-    timer.start()  # Start the timer for updates
+    global acquisition, sources
+    if acquisition is not None and acquisition.is_alive():
+        return
+    # A thread can only be started once, so every start gets a new worker
+    if device_streams:
+        # The device streams are read concurrently by an asyncio loop on the worker thread
+        acquisition = IngestThread()
+        sources = [acquisition.add_stream(spec, count, max_batches=queue_batches)
+                   for spec, count in device_streams]
+    else:
+        acquisition = AcquisitionThread(generate_batch, sample_rate, batch_size, queue_batches)
+        sources = [acquisition]
+    acquisition.start()
+    scheduler.reset()
+    timer.start(0)  # First frame as soon as possible
     print("Data generation started.")
 
 def stop_generation():
     """Stop data generation."""
     timer.stop()  # Stop the timer for updates
+    if acquisition is not None:
+        acquisition.stop()
     print("Data generation stopped.")
 
 # Connect buttons to their actions
 start_button.clicked.connect(start_generation)
 stop_button.clicked.connect(stop_generation)
 
-# Connect the timer to the update_plot function
-timer.timeout.connect(update_plot)
+# Connect the timer to the frame scheduler
+timer.timeout.connect(on_frame)
 
 # Show the window
 window.show()
 
 # Run the PyQt6 application event loop
-sys.exit(app.exec())
+exit_code = app.exec()
+if acquisition is not None:
+    acquisition.stop()
+sys.exit(exit_code)
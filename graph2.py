@@ -1,3 +1,5 @@
+import numpy as np
+
 class MagneticSensorSmoothing:
     def __init__(self, alpha=0.1):
         """
@@ -22,6 +24,69 @@ class MagneticSensorSmoothing:
             self.real_setting += self.alpha * (input_value - self.real_setting)
         return self.real_setting
 
+class BatchMagneticSensorSmoothing:
+    def __init__(self, channels, alpha=0.1, method="exact"):
+        """
+        Initialize the smoothing algorithm for a block of sensors.
+        :param channels: Number of sensors smoothed in parallel.
+        :param alpha: Smoothing factor (0 < alpha <= 1), shared by all channels.
+        :param method: "exact" steps all channels together one sample at a time and
+                       gives the same values as repeated MagneticSensorSmoothing.update()
+                       calls. "lfilter" runs the recursion as an IIR filter along the
+                       samples axis (scipy.signal.lfilter); it is much faster on long
+                       blocks but rounds differently (last few bits).
+        """
+        if method not in ("exact", "lfilter"):
+            raise ValueError(f"Unknown method: {method}")
+        self.alpha = alpha
+        self.method = method
+        self.real_setting = np.zeros(channels)  # One smoothed value per channel
+        self.initialized = np.zeros(channels, dtype=bool)
+
+    def reset(self):
+        """Forget the smoothed values; the next sample re-initializes every channel."""
+        self.real_setting[:] = 0.0
+        self.initialized[:] = False
+
+    def update(self, block):
+        """
+        Update the smoothed values from a block of inputs.
+        :param block: Array of shape (channels, samples), or (channels,) for a single sample.
+        :return: Smoothed values with the same shape as the block.
+        """
+        block = np.asarray(block, dtype=float)
+        single = block.ndim == 1
+        if single:
+            block = block[:, np.newaxis]
+        if block.shape[0] != self.real_setting.shape[0]:
+            raise ValueError(f"Expected {self.real_setting.shape[0]} channels, got {block.shape[0]}")
+
+        out = np.empty_like(block)
+        if block.shape[1] == 0:
+            return out[:, 0] if single else out
+
+        # First column: channels seen for the first time take the input as is
+        state = self.real_setting
+        new = ~self.initialized
+        old = self.initialized
+        state[old] += self.alpha * (block[old, 0] - state[old])
+        state[new] = block[new, 0]
+        self.initialized[:] = True
+        out[:, 0] = state
+
+        if self.method == "exact":
+            for n in range(1, block.shape[1]):
+                state += self.alpha * (block[:, n] - state)
+                out[:, n] = state
+        else:
+            from scipy.signal import lfilter
+            # y[n] = alpha * x[n] + (1 - alpha) * y[n-1], continued from the first column
+            zi = ((1 - self.alpha) * state)[:, np.newaxis]
+            out[:, 1:], _ = lfilter([self.alpha], [1.0, self.alpha - 1.0], block[:, 1:], axis=1, zi=zi)
+            state[:] = out[:, -1]
+
+        return out[:, 0] if single else out
+
 if __name__ == "__main__":
     import time
     import random
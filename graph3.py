@@ -1,5 +1,6 @@
 import time
 import random
+import numpy as np
 import matplotlib.pyplot as plt
 
 class MagneticSensorSmoothing:
@@ -26,6 +27,80 @@ class MagneticSensorSmoothing:
             self.real_setting += self.alpha * (input_value - self.real_setting)
         return self.real_setting
 
+class DecimatingHistory:
+    def __init__(self, capacity=2048):
+        """
+        Bounded plot history for one series.
+        All samples are kept until `capacity` points are stored. After that the
+        history is compacted by min/max decimation (every 4 points become the 2
+        extremes), and new samples are folded into buckets of the same size, so
+        memory and the number of plotted points stay bounded however long it runs.
+        :param capacity: Maximum number of stored points (multiple of 4, at least 8).
+        """
+        if capacity < 8 or capacity % 4:
+            raise ValueError("capacity must be a multiple of 4 and at least 8")
+        self.capacity = capacity
+        # Two extra slots hold the min/max of the bucket that is still being filled
+        self.x = np.empty(capacity + 2)
+        self.y = np.empty(capacity + 2)
+        self.size = 0  # Committed points
+        self.bucket = 1  # Samples represented by each min/max pair (1 = raw samples)
+        self.pending = 0  # Samples in the bucket being filled
+
+    def append(self, x_value, y_value):
+        """
+        Add one sample.
+        :param x_value: Sample position (e.g. iteration number).
+        :param y_value: Sample value.
+        """
+        if self.bucket == 1:
+            self.x[self.size] = x_value
+            self.y[self.size] = y_value
+            self.size += 1
+        else:
+            lo, hi = self.size, self.size + 1
+            if self.pending == 0:
+                self._pending_min = self._pending_max = (x_value, y_value)
+            elif y_value < self._pending_min[1]:
+                self._pending_min = (x_value, y_value)
+            elif y_value > self._pending_max[1]:
+                self._pending_max = (x_value, y_value)
+            # Keep the two extremes in time order
+            first, second = sorted((self._pending_min, self._pending_max))
+            self.x[lo], self.y[lo] = first
+            self.x[hi], self.y[hi] = second
+            self.pending += 1
+            if self.pending == self.bucket:
+                self.size += 2
+                self.pending = 0
+        if self.size == self.capacity:
+            self._compact()
+
+    def _compact(self):
+        """Halve the stored points: keep the min and the max of every group of 4."""
+        x = self.x[:self.capacity].reshape(-1, 4)
+        y = self.y[:self.capacity].reshape(-1, 4)
+        rows = np.arange(len(y))
+        i_min = y.argmin(axis=1)
+        i_max = y.argmax(axis=1)
+        first = np.minimum(i_min, i_max)
+        second = np.maximum(i_min, i_max)
+        half = self.capacity // 2
+        new_x = np.column_stack((x[rows, first], x[rows, second])).ravel()
+        new_y = np.column_stack((y[rows, first], y[rows, second])).ravel()
+        self.x[:half] = new_x
+        self.y[:half] = new_y
+        self.size = half
+        self.bucket = 4 if self.bucket == 1 else self.bucket * 2
+
+    def data(self):
+        """
+        Return (x, y) views of the stored points, including the open bucket.
+        :return: Arrays ready for line.set_data (no copy).
+        """
+        n = self.size + (2 if self.pending else 0)
+        return self.x[:n], self.y[:n]
+
 if __name__ == "__main__":
     # Create an instance of the smoothing algorithm
     smoother = MagneticSensorSmoothing(alpha=0.05)
@@ -35,9 +110,9 @@ if __name__ == "__main__":
 
     # Prepare for plotting
     iterations = 1000
-    x_vals = []  # Iteration numbers
-    input_vals = []  # Input values
-    smoothed_vals = []  # Smoothed values
+    history_capacity = 512  # Points kept per curve; older data is min/max decimated beyond that
+    input_history = DecimatingHistory(history_capacity)  # Input values by iteration
+    smoothed_history = DecimatingHistory(history_capacity)  # Smoothed values by iteration
 
     plt.ion()  # Interactive mode for real-time updating
     fig, ax = plt.subplots()
@@ -56,13 +131,12 @@ if __name__ == "__main__":
         smoothed_value = smoother.update(input_value)
 
         # Update data for plotting
-        x_vals.append(i)
-        input_vals.append(input_value)
-        smoothed_vals.append(smoothed_value)
+        input_history.append(i, input_value)
+        smoothed_history.append(i, smoothed_value)
 
         # Update the plot
-        line1.set_data(x_vals, input_vals)
-        line2.set_data(x_vals, smoothed_vals)
+        line1.set_data(*input_history.data())
+        line2.set_data(*smoothed_history.data())
         ax.set_xlim(0, max(10, i))  # Dynamically adjust x-axis
         plt.pause(0.01)  # Pause for a brief moment to update the plot
 
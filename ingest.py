@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import numpy as np
+
+# Framed sample packets, as sent by a device (or `python ingest.py serve`):
+#   header  <2sHII: magic b"SP", channels, samples per channel, sequence number
+#   payload channels * samples values of the stream dtype, interleaved by frame
+#           ([ch0 ch1 ... ch0 ch1 ...], the usual ADC order)
+# Stream specs: "unix:/path/to.sock", "tcp:host:port", "pipe:/path/to.fifo" ("pipe:-" is stdin).
+HEADER = struct.Struct("<2sHII")
+MAGIC = b"SP"
+
+def encode_packet(samples, sequence, dtype="<f4"):
+    """
+    :param samples: (channels, n) array, or (n,) for one channel.
+    :return: One framed packet as bytes.
+    """
+    samples = np.atleast_2d(samples)
+    channels, n = samples.shape
+    payload = np.ascontiguousarray(samples.T, dtype=dtype)
+    return HEADER.pack(MAGIC, channels, n, sequence & 0xFFFFFFFF) + payload.tobytes()
+
+class PacketDecoder:
+    """
+    Reassemble packets from a byte stream and decode them in batches.
+
+    feed() takes whatever bytes arrived (packets may be split or several at once)
+    and returns all complete packets as one (channels, n) float array: every
+    payload is an np.frombuffer view and they are joined with a single copy.
+    A header is accepted only if its channel count is the expected one and its
+    sample count is within max_samples; otherwise (junk containing the magic,
+    a connection joined mid-packet) one byte is dropped and the magic is
+    searched for again, so a bogus size can never stall the stream.
+    """
+
+    def __init__(self, channels=None, dtype="<f4", max_samples=65536, max_channels=1024):
+        """
+        :param channels: Expected channel count; None takes it from the first packet.
+        :param dtype: Sample dtype of the payload.
+        :param max_samples: Largest accepted samples-per-channel count in a packet.
+        :param max_channels: Largest channel count accepted for the first packet when channels is None.
+        """
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.max_samples = max_samples
+        self.max_channels = max_channels
+        self.packets = 0
+        self.lost = 0  # Packets missing according to the sequence numbers
+        self.rejected = 0  # Headers rejected (unexpected channel count or size)
+        self.skipped_bytes = 0  # Bytes discarded while resynchronizing
+        self.reset()
+
+    def reset(self):
+        """
+        Start a new connection: drop a partial packet and forget the last sequence
+        number, so no gap is counted across connections. Counters and the channel
+        count are kept.
+        """
+        self._buffer = bytearray()
+        self.sequence = None  # Sequence number of the last packet
+
+    def _valid(self, channels, samples):
+        if not 1 <= samples <= self.max_samples:
+            return False
+        if self.channels is None:
+            return 1 <= channels <= self.max_channels
+        return channels == self.channels
+
+    def feed(self, data):
+        """
+        :param data: Newly received bytes.
+        :return: (channels, n) float64 array with the decoded samples (n may be 0).
+        """
+        buffer = self._buffer
+        buffer += data
+        pos = 0
+        parts = []
+        while len(buffer) - pos >= HEADER.size:
+            magic, channels, samples, sequence = HEADER.unpack_from(buffer, pos)
+            if magic != MAGIC:
+                found = buffer.find(MAGIC, pos + 1)
+                end = found if found >= 0 else len(buffer) - 1  # Keep a byte that may start the magic
+                self.skipped_bytes += end - pos
+                pos = end
+                continue
+            if not self._valid(channels, samples):
+                # Not a real header: skip one byte and look for the next magic
+                self.rejected += 1
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+            size = channels * samples * self.dtype.itemsize
+            if len(buffer) - pos - HEADER.size < size:
+                break  # Rest of the packet not received yet
+            if self.channels is None:
+                self.channels = channels
+            if self.sequence is not None:
+                self.lost += (sequence - self.sequence - 1) & 0xFFFFFFFF
+            self.sequence = sequence
+            parts.append(np.frombuffer(buffer, self.dtype, channels * samples, pos + HEADER.size)
+                         .reshape(samples, channels))
+            self.packets += 1
+            pos += HEADER.size + size
+
+        channels = self.channels or 0
+        batch = np.concatenate(parts).T.astype(float) if parts else np.empty((channels, 0))
+        parts.clear()  # Release the views before the consumed bytes are removed
+        del buffer[:pos]
+        return batch
+
+class DeviceStream:
+    """
+    One device connection. Decoded batches wait in a bounded queue with the same
+    drain()/counters() interface as AcquisitionThread, so the GUI treats a
+    device exactly like the simulated source.
+    """
+
+    def __init__(self, spec, channels=None, dtype="<f4", max_batches=100):
+        """
+        :param spec: "unix:PATH", "tcp:HOST:PORT" or "pipe:PATH".
+        :param channels: Expected channel count (None: from the first packet).
+        :param dtype: Sample dtype of the payload.
+        :param max_batches: Queue capacity in batches (one batch per read).
+        """
+        self.spec = spec
+        self.decoder = PacketDecoder(channels, dtype)
+        self.queue = queue.Queue(maxsize=max_batches)
+        self._lock = threading.Lock()
+        self.received = 0  # Samples accepted into the queue
+        self.dropped = 0  # Samples lost because the queue was full
+        self.queued = 0  # Samples waiting in the queue
+        self.connected = False
+
+    @property
+    def channels(self):
+        return self.decoder.channels
+
+    def put(self, batch):
+        """Queue a decoded batch (called on the ingestion thread)."""
+        if batch.shape[-1] == 0:
+            return
+        try:
+            self.queue.put_nowait(batch)
+            with self._lock:
+                self.received += batch.shape[-1]
+                self.queued += batch.shape[-1]
+        except queue.Full:
+            with self._lock:
+                self.dropped += batch.shape[-1]
+
+    def drain(self):
+        """
+        Take everything queued so far (call once per frame from the GUI thread).
+        :return: (channels, n) samples in arrival order (an empty 1-D array if nothing was queued).
+        """
+        batches = []
+        while True:
+            try:
+                batches.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batches:
+            return np.empty(0)
+        samples = np.concatenate(batches, axis=-1)
+        with self._lock:
+            self.queued -= samples.shape[-1]
+        return samples
+
+    def counters(self):
+        """
+        :return: Dict with received, dropped, queued sample counts and lost packets.
+        """
+        with self._lock:
+            return {"received": self.received, "dropped": self.dropped, "queued": self.queued,
+                    "lost": self.decoder.lost}
+
+async def open_stream(spec):
+    """
+    Connect to a device stream.
+    :return: (asyncio.StreamReader, close callable).
+    """
+    kind, _, address = spec.partition(":")
+    if kind == "unix":
+        reader, writer = await asyncio.open_unix_connection(address)
+        return reader, writer.close
+    if kind == "tcp":
+        host, _, port = address.rpartition(":")
+        reader, writer = await asyncio.open_connection(host or "127.0.0.1", int(port))
+        return reader, writer.close
+    if kind == "pipe":
+        # O_NONBLOCK so that opening a FIFO does not wait for the writer
+        fd = 0 if address == "-" else os.open(address, os.O_RDONLY | os.O_NONBLOCK)
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader),
+                                                    os.fdopen(fd, "rb", buffering=0, closefd=fd != 0))
+        return reader, transport.close
+    raise ValueError(f"Unknown stream spec: {spec!r}")
+
+class IngestThread(threading.Thread):
+    """
+    Run an asyncio event loop on a worker thread that reads several device
+    streams concurrently. The Qt event loop is never blocked: the GUI only
+    drains each DeviceStream's queue from its frame timer, as with
+    AcquisitionThread. Streams reconnect after a delay when they close.
+    """
+
+    def __init__(self, reconnect_delay=1.0, read_size=1 << 16):
+        """
+        :param reconnect_delay: Seconds between connection attempts.
+        :param read_size: Maximum bytes read (and decoded as one batch) per read.
+        """
+        super().__init__(daemon=True)
+        self.reconnect_delay = reconnect_delay
+        self.read_size = read_size
+        self.streams = []
+        self._loop = None
+        self._stopping = None
+        self._ready = threading.Event()
+
+    def add_stream(self, spec, channels=None, dtype="<f4", max_batches=100):
+        """
+        Add a device stream (before start()).
+        :return: The DeviceStream to drain from the GUI.
+        """
+        if self.is_alive():
+            raise RuntimeError("Streams must be added before the thread is started")
+        stream = DeviceStream(spec, channels, dtype, max_batches)
+        self.streams.append(stream)
+        return stream
+
+    def run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._stopping = asyncio.Event()
+        self._ready.set()
+        tasks = [asyncio.create_task(self._read(stream)) for stream in self.streams]
+        await self._stopping.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read(self, stream):
+        while True:
+            try:
+                reader, close = await open_stream(stream.spec)
+            except OSError as error:
+                print(f"{stream.spec}: {error}; retrying in {self.reconnect_delay} s")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            stream.decoder.reset()  # A new connection continues no packet and no sequence
+            stream.connected = True
+            try:
+                while data := await reader.read(self.read_size):
+                    stream.put(stream.decoder.feed(data))
+            except OSError as error:
+                print(f"{stream.spec}: {error}")
+            finally:
+                stream.connected = False
+                close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def stop(self, timeout=1.0):
+        """Close all streams and wait for the worker."""
+        if self._ready.wait(timeout) and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self.is_alive():
+            self.join(timeout)
+
+    def counters(self):
+        """
+        :return: Dict with the counters of all streams added together.
+        """
+        total = {"received": 0, "dropped": 0, "queued": 0, "lost": 0}
+        for stream in self.streams:
+            for key, value in stream.counters().items():
+                total[key] += value
+        return total
+
+# --- Local device simulator and headless consumer ---
+async def serve(spec, channels=8, sample_rate=10000.0, packet_samples=100, dtype="<f4", seed=None):
+    """
+    Send a synthetic signal (synth.SignalGenerator) as framed packets at
+    sample_rate, listening on a unix/tcp spec or writing into a pipe.
+    """
+    from synth import SignalGenerator
+
+    async def send(writer):
+        generator = SignalGenerator(sample_rate, channels=channels, seed=seed)
+        period = packet_samples / sample_rate
+        next_time = time.perf_counter()
+        sequence = 0
+        try:
+            while True:
+                writer.write(encode_packet(generator(packet_samples), sequence, dtype))
+                await writer.drain()
+                sequence += 1
+                next_time += period
+                await asyncio.sleep(max(next_time - time.perf_counter(), 0))
+        except (ConnectionError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(reader, writer):
+        await send(writer)
+
+    kind, _, address = spec.partition(":")
+    if kind == "unix":
+        server = await asyncio.start_unix_server(handle, address)
+    elif kind == "tcp":
+        host, _, port = address.rpartition(":")
+        server = await asyncio.start_server(handle, host or "127.0.0.1", int(port))
+    elif kind == "pipe":
+        loop = asyncio.get_running_loop()
+        pipe = open(address, "wb", buffering=0) if address != "-" else os.fdopen(1, "wb", buffering=0)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, pipe)
+        await send(asyncio.StreamWriter(transport, protocol, None, loop))
+        return
+    else:
+        raise ValueError(f"Unknown stream spec: {spec!r}")
+    async with server:
+        await server.serve_forever()
+
+def listen(specs, channels=None, dtype="<f4", seconds=10.0, report_interval=1.0):
+    """Read the streams without a GUI and report the received sample rates."""
+    ingest = IngestThread()
+    streams = [ingest.add_stream(spec, channels, dtype) for spec in specs]
+    ingest.start()
+    start = last = time.perf_counter()
+    totals = [0] * len(streams)
+    try:
+        while time.perf_counter() - start < seconds:
+            time.sleep(report_interval)
+            now = time.perf_counter()
+            for i, stream in enumerate(streams):
+                n = stream.drain().shape[-1]
+                totals[i] += n
+                counters = stream.counters()
+                print(f"{stream.spec}: {n / (now - last):.0f} samples/s x {stream.channels} channels "
+                      f"(lost packets {counters['lost']}, dropped {counters['dropped']})")
+            last = now
+    finally:
+        ingest.stop()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Framed sample packets over local sockets/pipes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="simulate a device")
+    p.add_argument("spec", help="unix:PATH, tcp:HOST:PORT or pipe:PATH")
+    p.add_argument("--channels", type=int, default=8)
+    p.add_argument("--rate", type=float, default=10000.0, help="samples per second per channel")
+    p.add_argument("--packet", type=int, default=100, help="samples per channel in a packet")
+    p.add_argument("--seed", type=int)
+    p = sub.add_parser("listen", help="read streams without a GUI and report rates")
+    p.add_argument("specs", nargs="+")
+    p.add_argument("--channels", type=int)
+    p.add_argument("--seconds", type=float, default=10.0)
+    for p in sub.choices.values():
+        p.add_argument("--dtype", default="<f4", help="payload sample dtype")
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.spec, args.channels, args.rate, args.packet, args.dtype, args.seed))
+        except KeyboardInterrupt:
+            pass
+    else:
+        listen(args.specs, args.channels, args.dtype, args.seconds)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import numpy as np
+
+# --- LMS Филтър (проба по проба, референтна реализация) ---
+def lms_filter(x, d, mu=0.01, filter_order=16):
+    """
+    x: референтен вход (шум)
+    d: сигнал със смущения
+    mu: скорост на учене
+    """
+    N = len(x)
+    y = np.zeros(N)
+    e = np.zeros(N)
+    w = np.zeros(filter_order)
+
+    for n in range(filter_order, N):
+        x_vec = x[n-filter_order:n][::-1]
+        y[n] = np.dot(w, x_vec)
+        e[n] = d[n] - y[n]
+        w += 2 * mu * e[n] * x_vec  # LMS актуализация
+    return e, y
+
+# --- LMS филтър с векторен вход (проба по проба, референтна реализация) ---
+def vector_lms_filter(X, d, mu=0.01):
+    """
+    X: (N, M) - N семпъла, M референтни канала (синусоиди)
+    d: (N,) измерен сигнал със смущения
+    mu: скорост на учене
+    """
+    N, M = X.shape
+    w = np.zeros(M)
+    y = np.zeros(N)
+    e = np.zeros(N)
+
+    for n in range(N):
+        x_n = X[n]
+        y[n] = np.dot(w, x_n)
+        e[n] = d[n] - y[n]
+        w += 2 * mu * e[n] * x_n
+    return e, y
+
+# --- Блоков LMS в честотната област (overlap-save) ---
+class FrequencyDomainLMS:
+    """
+    Бърз блоков LMS: теглата се обновяват веднъж на блок от filter_order проби,
+    а филтрирането и градиентът се смятат с FFT с дължина 2*filter_order
+    (overlap-save, с ограничение на градиента). Цена O(log M) на проба вместо O(M).
+    Входът е закъснял с една проба както в lms_filter (x_vec = x[n-M:n][::-1]).
+    Теглата и историята се пазят между извикванията на process().
+    Градиентът се сумира по целия блок, затова при дълги филтри mu трябва да е
+    по-малко от това за lms_filter (грубо mu * M * мощност на x << 1); при такива
+    mu резултатът практически съвпада с lms_filter.
+    """
+
+    def __init__(self, filter_order=256, mu=0.01):
+        """
+        filter_order: брой тегла M (и дължина на блока)
+        mu: скорост на учене (същото значение като в lms_filter)
+        """
+        self.filter_order = filter_order
+        self.mu = mu
+        M = filter_order
+        self._W = np.zeros(M + 1, dtype=complex)  # rfft на [w, 0...0] с дължина 2M
+        self._u = np.zeros(2 * M)  # [предишен блок, текущ блок] от закъснелия вход
+        self._last_x = 0.0  # x[n-1] за закъснението с една проба
+        self._pending_x = np.empty(0)
+        self._pending_d = np.empty(0)
+
+    @property
+    def weights(self):
+        """Теглата във времевата област (w[k] умножава x[n-1-k])."""
+        return np.fft.irfft(self._W, n=2 * self.filter_order)[:self.filter_order]
+
+    def _block(self, x, d):
+        M = self.filter_order
+        # u[n] = x[n-1]
+        self._u[:M] = self._u[M:]
+        self._u[M] = self._last_x
+        self._u[M + 1:] = x[:-1]
+        self._last_x = x[-1]
+
+        U = np.fft.rfft(self._u)
+        y = np.fft.irfft(U * self._W, n=2 * M)[M:]
+        e = d - y
+
+        E = np.fft.rfft(np.concatenate((np.zeros(M), e)))
+        gradient = np.fft.irfft(np.conj(U) * E, n=2 * M)[:M]  # sum e[n] * u[n-k]
+        self._W += np.fft.rfft(np.concatenate((2 * self.mu * gradient, np.zeros(M))))
+        return e, y
+
+    def process(self, x, d):
+        """
+        x: следващото парче от референтния вход
+        d: същото парче от сигнала със смущения
+        Връща (e, y) за всички завършени блокове; остатъкът се пази за следващото
+        извикване, затова изходът може да е по-къс или по-дълъг от входа.
+        """
+        x = np.concatenate((self._pending_x, np.asarray(x, dtype=float)))
+        d = np.concatenate((self._pending_d, np.asarray(d, dtype=float)))
+        M = self.filter_order
+        blocks = len(x) // M
+        e = np.empty(blocks * M)
+        y = np.empty(blocks * M)
+        for i in range(blocks):
+            s = slice(i * M, (i + 1) * M)
+            e[s], y[s] = self._block(x[s], d[s])
+        self._pending_x = x[blocks * M:]
+        self._pending_d = d[blocks * M:]
+        return e, y
+
+def block_lms_filter(x, d, mu=0.01, filter_order=16):
+    """
+    Същият интерфейс като lms_filter, но с FrequencyDomainLMS.
+    Последният непълен блок се филтрира с текущите тегла, без обновяване.
+    """
+    lms = FrequencyDomainLMS(filter_order, mu)
+    e, y = lms.process(x, d)
+    rest = len(x) - len(e)
+    if rest:
+        w = lms.weights
+        u = np.concatenate((np.zeros(filter_order), np.asarray(x, dtype=float)))
+        # u[filter_order + n] = x[n]; x_vec за проба n е x[n-M:n][::-1]
+        y_rest = np.array([np.dot(w, u[n:n + filter_order][::-1]) for n in range(len(x) - rest, len(x))])
+        e = np.concatenate((e, np.asarray(d[len(x) - rest:], dtype=float) - y_rest))
+        y = np.concatenate((y, y_rest))
+    return e, y
+
+# --- Референции за синусоидални смущения ---
+def sinusoid_refs(freqs, n, fs, start=0, out=None):
+    """
+    sin и cos за всяка честота: (n, 2 * len(freqs)), колони [sin f1, cos f1, sin f2, ...].
+    С двойката LMS потиска смущение с произволна фаза (a sin + b cos), а не
+    само такова във фаза със синусоидата.
+    start: номер на първата проба (фазата продължава между парчетата)
+    out: по избор масив (n, 2 * len(freqs)) за резултата
+    """
+    w = 2 * np.pi * np.asarray(freqs, dtype=float) / fs
+    if out is None:
+        out = np.empty((n, 2 * len(w)))
+    phase = out[:, 0::2]
+    np.multiply(np.arange(start, start + n, dtype=float)[:, np.newaxis], w, out=phase)
+    np.cos(phase, out=out[:, 1::2])
+    np.sin(phase, out=phase)
+    return out
+
+# --- Векторен LMS за много канали наведнъж ---
+class MultichannelLMS:
+    """
+    vector_lms_filter за много канали едновременно: теглата са матрица
+    (канали, M) и всяка стъпка обновява всички канали с една векторна операция.
+    block_size=1 дава точно LMS проба по проба; при по-голям блок теглата се
+    обновяват веднъж на блок (блоков LMS) с матрично умножение за целия блок.
+    normalized=True: NLMS – стъпката се дели на мощността на референтния вход,
+    така че едно mu работи при различни усилвания на каналите.
+    Теглата се пазят между извикванията на process().
+    """
+
+    def __init__(self, channels, num_refs, mu=0.01, block_size=1, normalized=False, eps=1e-8):
+        """
+        channels: брой канали
+        num_refs: брой референтни сигнали M (напр. 3 синусоиди)
+        mu: скорост на учене (при normalized – нормирана стъпка, 0 < mu < 1)
+        block_size: проби на обновяване на теглата
+        eps: предпазва от деление на нула при NLMS
+        """
+        self.channels = channels
+        self.mu = mu
+        self.block_size = block_size
+        self.normalized = normalized
+        self.eps = eps
+        self.weights = np.zeros((channels, num_refs))
+
+    def process(self, X, d):
+        """
+        X: (N, M) референции, общи за всички канали, или (канали, N, M) – отделни
+        d: (канали, N) измерени сигнали
+        Връща (e, y), всеки (канали, N).
+        """
+        X = np.asarray(X, dtype=float)
+        d = np.asarray(d, dtype=float)
+        shared = X.ndim == 2
+        C, N = d.shape
+        if C != self.channels:
+            raise ValueError(f"Очаквани {self.channels} канала, получени {C}")
+        y = np.empty((C, N))
+        e = np.empty((C, N))
+        W = self.weights
+        L = self.block_size
+        for start in range(0, N, L):
+            s = slice(start, min(start + L, N))
+            Xb = X[s] if shared else X[:, s]  # (L, M) или (C, L, M)
+            if shared:
+                yb = W @ Xb.T  # (C, L)
+            else:
+                yb = np.einsum('cm,clm->cl', W, Xb)
+            eb = d[:, s] - yb
+            y[:, s] = yb
+            e[:, s] = eb
+            step = 2 * self.mu
+            if self.normalized:
+                power = np.sum(Xb * Xb, axis=(-2, -1))  # скалар или (C,)
+                step = step / (self.eps + power)
+                if not shared:
+                    step = step[:, np.newaxis]
+            if shared:
+                W += step * eb @ Xb if L > 1 else (step * eb) * Xb
+            else:
+                W += step * np.einsum('cl,clm->cm', eb, Xb)
+        return e, y
@@ -1,5 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from filters import moving_average_filter
+from stats import mean_power
 
 # --- Генериране на проби ---
 def generate_noise_samples(n, noise_std=0.05):
@@ -10,14 +12,6 @@ def generate_signal_samples(n, signal_value=1.0, noise_std=0.05):
     signal = np.full(n, signal_value)
     return signal + noise
 
-# --- Средна мощност (RMS^2) ---
-def mean_power(samples):
-    return np.mean(samples ** 2)
-
-# --- Филтър с движещо се средно ---
-def moving_average_filter(samples, window_size=5):
-    return np.convolve(samples, np.ones(window_size)/window_size, mode='valid')
-
 # --- Симулация ---
 N = 1000
 SIGNAL_VALUE = 1.0
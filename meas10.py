@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from spectral import StreamingFFTNotch
 
 # === Анотация ===
 print("Пример: Филтрация в честотната област чрез FFT\n"
@@ -38,6 +39,10 @@ fft_filtered = notch_filter(freqs, fft_vals, notch_freqs=[50, 100], width=1.5)
 # --- Възстановяване във времева област ---
 filtered_signal = np.fft.irfft(fft_filtered, n=N)
 
+# --- Същото на кадри (overlap-add) – за поток, със закъснение до един кадър ---
+streaming_notch = StreamingFFTNotch([50, 100], fs, frame_size=256)
+streamed_signal = np.concatenate([streaming_notch.process(measured_signal), streaming_notch.flush()])
+
 # --- Визуализация ---
 fig, axs = plt.subplots(3, 1, figsize=(12, 10))
 
@@ -54,6 +59,7 @@ axs[1].grid()
 axs[1].legend()
 
 axs[2].plot(t, filtered_signal, label="Филтриран сигнал", color='green')
+axs[2].plot(t, streamed_signal, label="Филтриран на кадри (256 проби)", alpha=0.7)
 axs[2].set_title("Сигнал след филтрация в честотната област")
 axs[2].grid()
 axs[2].legend()
@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from triac import add_triac_spikes, mask_triac_spikes
 
 # --- 📝 Анотация ---
 print("Симулация на смущения от триак и премахване на засегнатите проби от сигнала.")
@@ -14,22 +15,9 @@ triac_triggers = [0.1, 0.2, 0.3, 0.4]  # Моменти на отпушване
 spike_width_ms = 1
 spike_amp = 5
 
-noisy_signal = signal.copy()
-for trigger in triac_triggers:
-    spike_start = int(trigger * fs)
-    spike_end = spike_start + int(spike_width_ms * fs / 1000)
-    noisy_signal[spike_start:spike_end] += spike_amp * np.random.randn(spike_end - spike_start)
+noisy_signal = add_triac_spikes(signal.copy(), triac_triggers, fs, spike_width_ms, spike_amp)
 
 # --- 🧹 Изолиране на смущения (маскиране) ---
-def mask_triac_spikes(sig, trigger_times, fs, window_ms=1):
-    masked = sig.copy()
-    window_samples = int(window_ms * fs / 1000)
-    for t_trigger in trigger_times:
-        start = int(t_trigger * fs)
-        end = start + window_samples
-        masked[start:end] = np.nan  # или интерполация
-    return masked
-
 masked_signal = mask_triac_spikes(noisy_signal, triac_triggers, fs)
 
 # --- 📈 Визуализация ---
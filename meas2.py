@@ -1,5 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from filters import exponential_filter, moving_average_filter
+from stats import mean_power
 
 # --- Генериране на проби ---
 def generate_noise_samples(n, noise_std=0.05):
@@ -10,21 +12,6 @@ def generate_signal_samples(n, signal_value=1.0, noise_std=0.05):
     signal = np.full(n, signal_value)
     return signal + noise
 
-# --- RMS мощност ---
-def mean_power(samples):
-    return np.mean(samples ** 2)
-
-# --- Филтри с движещо се средно и експоненциален ---
-def moving_average_filter(samples, window_size=5):
-    return np.convolve(samples, np.ones(window_size)/window_size, mode='valid')
-
-def exponential_filter(samples, alpha=0.1):
-    filtered = np.zeros_like(samples)
-    filtered[0] = samples[0]
-    for i in range(1, len(samples)):
-        filtered[i] = alpha * samples[i] + (1 - alpha) * filtered[i - 1]
-    return filtered
-
 # --- Настройки ---
 N = 1000
 SIGNAL_VALUE = 1.0
@@ -49,7 +36,7 @@ ma_signal_power = ma_power - noise_power
 ma_signal_rms = np.sqrt(ma_signal_power)
 
 # --- Експоненциален филтър ---
-exp_signal = exponential_filter(raw_signal_samples, alpha=ALPHA)
+exp_signal, _ = exponential_filter(raw_signal_samples, alpha=ALPHA)
 exp_power = mean_power(exp_signal)
 exp_signal_power = exp_power - noise_power
 exp_signal_rms = np.sqrt(exp_signal_power)
@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import iirnotch, filtfilt
+from filters import StreamingNotch
+from stats import rms
 
 # --- Настройки ---
 fs = 1000             # Честота на дискретизация (Hz)
@@ -23,17 +25,25 @@ Q = 30.0   # Quality factor (по-високо Q -> по-тясна лента)
 b, a = iirnotch(f0, Q, fs)
 filtered_signal = filtfilt(b, a, measured_signal)
 
-# --- Изчисления ---
-def power(x): return np.mean(x**2)
-def rms(x): return np.sqrt(power(x))
+# --- Същият notch в реално време: причинен, на блокове от 10 проби ---
+block_size = 10
+streaming_notch = StreamingNotch([f0], Q, fs)
+streaming_notch.reset(first=measured_signal[0])  # Без преходен процес в началото
+streamed_signal = np.concatenate([
+    streaming_notch.process(measured_signal[i:i + block_size])
+    for i in range(0, len(measured_signal), block_size)
+])
 
+# --- Изчисления ---
 print(f"RMS преди филтър:  {rms(measured_signal):.6f}")
 print(f"RMS след филтър:   {rms(filtered_signal):.6f}")
+print(f"RMS след поточен:  {rms(streamed_signal):.6f}")
 
 # --- Графики ---
 plt.figure(figsize=(12, 6))
 plt.plot(t, measured_signal, label="Сигнал + вътрешен + външен шум", alpha=0.4)
 plt.plot(t, filtered_signal, label="След notch филтър (50 Hz)", linewidth=2)
+plt.plot(t, streamed_signal, label="Поточен notch (причинен)", linewidth=1)
 plt.axhline(signal_value, color='green', linestyle='--', label="Истински сигнал (DC)")
 plt.title("Филтриране на външен синусоиден шум (50 Hz)")
 plt.xlabel("Време [s]")
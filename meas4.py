@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import iirnotch, filtfilt
+from filters import apply_notch_bank
+from stats import rms
 
 # --- Настройки ---
 fs = 1000  # Sampling frequency (Hz)
@@ -22,18 +23,10 @@ external_noise = (
 measured_signal = pure_signal + internal_noise + external_noise
 
 # --- Прилагане на няколко notch филтъра ---
-def apply_notch(sig, freq, Q=30.0):
-    b, a = iirnotch(freq, Q, fs)
-    return filtfilt(b, a, sig)
-
-filtered_signal = measured_signal
-for f in [100, 200, 300]:
-    filtered_signal = apply_notch(filtered_signal, f)
+# Всички хармоници в една каскада, едно нулевофазово преминаване
+filtered_signal = apply_notch_bank(measured_signal, [100, 200, 300], Q=30.0, fs=fs)
 
 # --- Метрики ---
-def power(x): return np.mean(x**2)
-def rms(x): return np.sqrt(power(x))
-
 print(f"RMS преди филтър:  {rms(measured_signal):.6f}")
 print(f"RMS след филтър:   {rms(filtered_signal):.6f}")
 
@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from lms import lms_filter
 
 # === Анотация ===
 print("Пример: Използване на адаптивен LMS филтър за премахване на 50 Hz смущения от измерен сигнал.\n"
@@ -30,25 +31,6 @@ measured_signal = pure_signal + internal_noise + external_noise
 # Референтен шумов вход (знаем формата на външния шум)
 reference_noise = external_noise
 
-# --- LMS Филтър ---
-def lms_filter(x, d, mu=0.01, filter_order=16):
-    """
-    x: референтен вход (шум)
-    d: сигнал със смущения
-    mu: скорост на учене
-    """
-    N = len(x)
-    y = np.zeros(N)
-    e = np.zeros(N)
-    w = np.zeros(filter_order)
-
-    for n in range(filter_order, N):
-        x_vec = x[n-filter_order:n][::-1]
-        y[n] = np.dot(w, x_vec)
-        e[n] = d[n] - y[n]
-        w += 2 * mu * e[n] * x_vec  # LMS актуализация
-    return e, y
-
 # --- Изпълнение ---
 output_signal, estimated_noise = lms_filter(reference_noise, measured_signal)
 
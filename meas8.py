@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import iirnotch, filtfilt
+from filters import apply_notch_bank
+from spectral import plot_spectrum
+from stats import rms
 
 # --- Настройки ---
 fs = 1000                # Sampling frequency (Hz)
@@ -24,18 +26,10 @@ external_noise = (
 measured_signal = pure_signal + internal_noise + external_noise
 
 # --- Notch филтриране на 50, 100, 150 Hz ---
-def apply_notch(sig, freq, Q=30.0):
-    b, a = iirnotch(freq, Q, fs)
-    return filtfilt(b, a, sig)
-
-filtered_signal = measured_signal
-for f in [50, 100, 150]:
-    filtered_signal = apply_notch(filtered_signal, f)
+# Всички хармоници в една каскада, едно нулевофазово преминаване
+filtered_signal = apply_notch_bank(measured_signal, [50, 100, 150], Q=30.0, fs=fs)
 
 # --- Функции за анализ ---
-def power(x): return np.mean(x**2)
-def rms(x): return np.sqrt(power(x))
-
 print(f"RMS преди филтър:  {rms(measured_signal):.6f}")
 print(f"RMS след филтър:   {rms(filtered_signal):.6f}")
 
@@ -52,18 +46,10 @@ axs[0].set_ylabel("Амплитуда")
 axs[0].grid(True)
 axs[0].legend()
 
-# --- FFT спектър ---
-def plot_fft(ax, sig, fs, label):
-    N = len(sig)
-    freqs = np.fft.rfftfreq(N, d=1/fs)
-    fft_vals = np.fft.rfft(sig)
-    fft_magnitude = np.abs(fft_vals) / N
-    ax.plot(freqs, fft_magnitude, label=label)
-
-plot_fft(axs[1], measured_signal, fs, "Преди филтър")
-plot_fft(axs[1], filtered_signal, fs, "След филтър")
+# --- Спектър (Welch, осреднен по сегменти) ---
+plot_spectrum(axs[1], [measured_signal, filtered_signal], fs, ["Преди филтър", "След филтър"])
 axs[1].set_xlim(0, 250)
-axs[1].set_title("Амплитуден спектър (FFT)")
+axs[1].set_title("Амплитуден спектър (Welch)")
 axs[1].set_xlabel("Честота [Hz]")
 axs[1].set_ylabel("Амплитуда")
 axs[1].grid(True)
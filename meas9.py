@@ -1,5 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from lms import vector_lms_filter
 
 # === Анотация ===
 print("Пример: LMS адаптивен филтър с множество синусоидални входове (50 Hz и хармоници)\n"
@@ -34,25 +35,6 @@ ref_signals = [np.sin(2 * np.pi * f * t) for f in ref_freqs]
 # Обединяваме всички синусоиди в една матрица: (N, M)
 X = np.stack(ref_signals, axis=1)  # shape: (samples, num_features)
 
-# --- LMS филтър с векторен вход ---
-def vector_lms_filter(X, d, mu=0.01):
-    """
-    X: (N, M) - N семпъла, M референтни канала (синусоиди)
-    d: (N,) измерен сигнал със смущения
-    mu: скорост на учене
-    """
-    N, M = X.shape
-    w = np.zeros(M)
-    y = np.zeros(N)
-    e = np.zeros(N)
-
-    for n in range(N):
-        x_n = X[n]
-        y[n] = np.dot(w, x_n)
-        e[n] = d[n] - y[n]
-        w += 2 * mu * e[n] * x_n
-    return e, y
-
 # --- Прилагане на филтъра ---
 filtered_signal, estimated_noise = vector_lms_filter(X, measured_signal, mu=0.01)
 
@@ -0,0 +1,333 @@
+import time
+_START = time.perf_counter()  # Преди всички други импорти – за отчета на времето за стартиране
+
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# === Анотация ===
+# Команден ред за обработка на записи без графичен интерфейс.
+# Пример:
+#   python measure.py notch --fs 10000 --freqs 50,100,150 -o out data/*.npy
+#   python measure.py triac --fs 10000 --trigger-rate 100 --plot out data/rec.npy
+#   python measure.py notch --causal --fs 10000 --dtype int16 --channels 4 --scale 0.001 -o out data/rec.bin
+#   python measure.py triac+notch+rms --causal --window 1000 --fs 10000 --stream data/rec.npy
+# matplotlib се импортира само при --plot; филтрите – само за избрания pipeline,
+# преди първия запис (времето им е в "imports_s", а не в "seconds").
+# Сурови записи (--dtype) и .npy с --stream се обработват на парчета от диска
+# (np.memmap) с постоянна памет; без тях целият запис се зарежда в паметта.
+
+PIPELINES = ("notch", "lms", "fftnotch", "triac", "rms")
+
+# --- Вход/изход ---
+def load_signal(path):
+    """
+    .npy -> както е записан; иначе текст (np.loadtxt).
+    Връща масив (канали, проби).
+    """
+    path = Path(path)
+    data = np.load(path) if path.suffix == ".npy" else np.loadtxt(path, ndmin=1)
+    data = np.asarray(data, dtype=float)
+    return data[np.newaxis] if data.ndim == 1 else data
+
+def parse_freqs(text):
+    return [float(f) for f in text.split(",") if f.strip()]
+
+def parse_pipeline(text):
+    """Един pipeline или верига, напр. "triac+notch+rms"."""
+    for name in text.split("+"):
+        if name not in PIPELINES:
+            raise argparse.ArgumentTypeError(f"непознат pipeline {name!r}; възможни: {', '.join(PIPELINES)}")
+    return text
+
+# --- Pipelines ---
+def run_notch(x, args):
+    if args.causal:
+        from filters import StreamingNotch
+        notch = StreamingNotch(args.freqs, args.Q, args.fs, channels=len(x))
+        notch.reset(first=x[:, 0])
+        return notch.process(x)
+    from filters import apply_notch_bank
+    return apply_notch_bank(x, args.freqs, Q=args.Q, fs=args.fs)
+
+def run_lms(x, args):
+    from lms import MultichannelLMS, sinusoid_refs
+    refs = sinusoid_refs(args.freqs, x.shape[1], args.fs)  # sin и cos – смущения с произволна фаза
+    engine = MultichannelLMS(len(x), refs.shape[1], mu=args.mu,
+                             block_size=args.block_size, normalized=args.nlms)
+    e, _ = engine.process(refs, x)
+    return e
+
+def fft_frame_size(args):
+    if args.frame_size:
+        return args.frame_size
+    # Резолюция поне 1/8 от най-ниската честота, за да не се засегне DC
+    return 1 << int(np.ceil(np.log2(8 * args.fs / min(args.freqs))))
+
+def run_fftnotch(x, args):
+    from spectral import StreamingFFTNotch
+    out = np.empty_like(x)
+    frame_size = fft_frame_size(args)
+    for c in range(len(x)):
+        notch = StreamingFFTNotch(args.freqs, args.fs, frame_size=frame_size)
+        out[c] = np.concatenate((notch.process(x[c]), notch.flush()))
+    return out
+
+def trigger_times(args, n):
+    if args.triggers:
+        return np.ravel(load_signal(args.triggers))
+    return np.arange(args.trigger_offset, n / args.fs, 1 / args.trigger_rate)
+
+def run_triac(x, args):
+    from triac import mask_triac_spikes, fill_gaps
+    triggers = trigger_times(args, x.shape[1])
+    out = np.empty_like(x)
+    for c in range(len(x)):
+        masked = mask_triac_spikes(x[c], triggers, args.fs, args.window_ms)
+        out[c] = fill_gaps(masked, kind=args.kind) if args.interpolate else masked
+    return out
+
+def run_rms(x, args):
+    if not args.window:
+        return None
+    from stats import SlidingRMS
+    return np.stack([SlidingRMS(args.window).process(row) for row in x])
+
+RUNNERS = {"notch": run_notch, "lms": run_lms, "fftnotch": run_fftnotch,
+           "triac": run_triac, "rms": run_rms}
+
+# Модули на всяка стъпка – импортират се преди обработката, за да не влиза
+# импортът (напр. SciPy) във времето на първия запис. stats внася filters
+# (и scipy) едва в SlidingRMS, затова rms изисква и двата.
+MODULES = {"notch": ("filters",), "lms": ("lms",), "fftnotch": ("spectral",), "triac": ("triac",),
+           "rms": ("stats", "filters")}
+
+# --- Поточни pipelines (записи на парчета) ---
+def build_stages(args):
+    """Етапите (pipeline.Stage) за args.pipeline, напр. "triac+notch+rms"."""
+    from pipeline import NotchStage, LMSStage, FFTNotchStage, TriacMaskStage, GapFillStage, RMSStage
+    stages = []
+    for name in args.pipeline.split("+"):
+        if name == "notch":
+            stages.append(NotchStage(args.freqs, args.Q, args.fs))
+        elif name == "lms":
+            stages.append(LMSStage(args.freqs, args.fs, args.mu, args.block_size, args.nlms))
+        elif name == "fftnotch":
+            stages.append(FFTNotchStage(args.freqs, args.fs, fft_frame_size(args)))
+        elif name == "triac":
+            triggers = np.ravel(load_signal(args.triggers)) if args.triggers else None
+            stages.append(TriacMaskStage(args.fs, args.window_ms, triggers,
+                                         args.trigger_rate, args.trigger_offset))
+            if args.interpolate:
+                stages.append(GapFillStage(args.kind))
+        elif name == "rms" and args.window:
+            stages.append(RMSStage(args.window))
+    return stages
+
+def open_recording(path, args):
+    from recording import Recording
+    if args.dtype:
+        return Recording(path, args.dtype, args.channels, args.fs, args.scale,
+                         args.layout, args.header_bytes)
+    return Recording.from_npy(path, args.fs, args.scale)
+
+class ChunkWriter:
+    """
+    Събира изхода на парчета (канали, проби): запис в .npy (np.lib.format.open_memmap),
+    мощност по канал и първите keep проби за графиката – без целия изход в паметта.
+    """
+
+    def __init__(self, channels, samples, path=None, keep=0):
+        from stats import PowerAccumulator
+        self.pos = np.zeros(channels, dtype=np.int64)  # Записани проби по канал
+        self.out = None
+        if path is not None:
+            shape = (samples,) if channels == 1 else (channels, samples)  # Както np.save в main
+            self.out = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=shape)
+            self.out = self.out.reshape(channels, samples)
+        self.head = np.full((channels, keep), np.nan)
+        self.power = [PowerAccumulator() for _ in range(channels)]
+
+    def write(self, rows):
+        keep = self.head.shape[1]
+        for c, row in enumerate(rows):
+            p = self.pos[c]
+            if self.out is not None:
+                self.out[c, p:p + len(row)] = row
+            if p < keep:
+                self.head[c, p:p + len(row)] = row[:keep - p]
+            self.power[c].update(row)
+            self.pos[c] += len(row)
+
+    def close(self):
+        if self.out is not None:
+            self.out.flush()
+        self.out = None
+
+def run_stream(name, args):
+    """Обработва записа на парчета; връща обобщението (и пътя на изхода)."""
+    from pipeline import Pipeline
+    rec = open_recording(name, args)
+    stages = build_stages(args)
+    chain = Pipeline(*stages, channels=rec.channels) if stages else None
+    keep = min(rec.samples, args.chunk) if args.plot else 0
+    out_path = None
+    if args.output and chain is not None:
+        out_dir = Path(args.output)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = out_dir / f"{Path(name).stem}.{args.pipeline}.npy"
+    inputs = ChunkWriter(rec.channels, rec.samples, keep=keep)
+    outputs = ChunkWriter(rec.channels, rec.samples, out_path, keep) if chain is not None else None
+    buffer = np.empty((rec.channels, args.chunk))  # Едно парче вход, използвано многократно
+
+    start = time.perf_counter()
+    for offset, x in rec.chunks(args.chunk, out=buffer):
+        inputs.write(x)
+        if chain is not None:
+            outputs.write(chain.process(x))
+    if chain is not None:
+        outputs.write(chain.flush())
+        outputs.close()
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "input": str(name),
+        "pipeline": args.pipeline,
+        "channels": rec.channels,
+        "samples": rec.samples,
+        "seconds": round(elapsed, 4),
+        "rms_in": [acc.rms for acc in inputs.power],
+    }
+    if outputs is not None:
+        summary["rms_out"] = [acc.rms for acc in outputs.power]
+    if out_path is not None:
+        summary["output"] = str(out_path)
+    head = (inputs.head, outputs.head if outputs is not None else None)
+    return summary, head
+
+# --- Графики (само при --plot) ---
+def save_plot(path, x, y, fs, title):
+    import matplotlib
+    matplotlib.use("Agg")  # Без дисплей – само запис във файл
+    import matplotlib.pyplot as plt
+
+    t = np.arange(x.shape[1]) / fs
+    fig, axs = plt.subplots(len(x), 1, figsize=(12, 3 * len(x)), squeeze=False)
+    for c, ax in enumerate(axs[:, 0]):
+        ax.plot(t, x[c], label="Вход", alpha=0.5)
+        if y is not None:
+            ax.plot(t, y[c], label="Изход", linewidth=1)
+        ax.set_xlabel("Време [s]")
+        ax.grid(True)
+        ax.legend()
+    axs[0, 0].set_title(title)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+# --- Команден ред ---
+def build_parser():
+    parser = argparse.ArgumentParser(description="Обработка на записи без графичен интерфейс.")
+    parser.add_argument("pipeline", type=parse_pipeline,
+                        help=f"{', '.join(PIPELINES)} или верига с +, напр. triac+notch+rms")
+    parser.add_argument("inputs", nargs="+", help=".npy (проби или канали x проби) или текстов файл")
+    parser.add_argument("--fs", type=float, required=True, help="честота на дискретизация (Hz)")
+    parser.add_argument("-o", "--output", help="папка за резултатите (.npy); без нея – само обобщение")
+    parser.add_argument("--plot", metavar="DIR", help="запис на графики (PNG) в папката")
+    parser.add_argument("--freqs", type=parse_freqs, default=[50.0, 100.0, 150.0], help="честоти, напр. 50,100,150")
+    parser.add_argument("--Q", type=float, default=30.0, help="notch: качествен фактор")
+    parser.add_argument("--causal", action="store_true", help="notch: причинен поточен филтър вместо filtfilt")
+    parser.add_argument("--mu", type=float, default=0.01, help="lms: скорост на учене")
+    parser.add_argument("--nlms", action="store_true", help="lms: нормиран LMS")
+    parser.add_argument("--block-size", type=int, default=1, help="lms: проби на обновяване")
+    parser.add_argument("--frame-size", type=int, default=0, help="fftnotch: дължина на кадъра (0 = според fs и честотите)")
+    parser.add_argument("--triggers", help="triac: файл с моментите на отпушване (s)")
+    parser.add_argument("--trigger-rate", type=float, default=100.0, help="triac: моменти в секунда без --triggers")
+    parser.add_argument("--trigger-offset", type=float, default=0.0, help="triac: първи момент (s)")
+    parser.add_argument("--window-ms", type=float, default=1.0, help="triac: ширина на маската (ms)")
+    parser.add_argument("--no-interpolate", dest="interpolate", action="store_false", help="triac: остават NaN")
+    parser.add_argument("--kind", choices=("linear", "cubic"), default="linear", help="triac: интерполация")
+    parser.add_argument("--window", type=int, default=0, help="rms: плъзгащ се RMS прозорец (проби)")
+    raw = parser.add_argument_group("обработка на парчета (сурови записи и --stream)")
+    raw.add_argument("--dtype", help="суров двоичен запис с този тип проби, напр. int16 или float32")
+    raw.add_argument("--channels", type=int, default=1, help="брой канали в суровия запис")
+    raw.add_argument("--layout", choices=("interleaved", "planar"), default="interleaved",
+                     help="подредба на каналите в суровия запис")
+    raw.add_argument("--scale", type=float, default=1.0, help="множител от единици на АЦП към физически")
+    raw.add_argument("--header-bytes", type=int, default=0, help="байтове заглавие в суровия запис")
+    raw.add_argument("--stream", action="store_true", help=".npy: на парчета (mmap) вместо целия запис")
+    raw.add_argument("--chunk", type=int, default=1 << 18, help="проби на канал в парче")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    names = args.pipeline.split("+")
+    streaming = bool(args.dtype) or args.stream
+    if streaming and "notch" in names and not args.causal:
+        parser.error("notch на парчета изисква --causal (filtfilt се нуждае от целия запис)")
+    if streaming and not args.dtype and any(Path(name).suffix != ".npy" for name in args.inputs):
+        parser.error("--stream работи само с .npy; за сурови записи задайте --dtype")
+    if streaming and "lms" in names:
+        args.chunk = -(-args.chunk // args.block_size) * args.block_size  # Блоковете на LMS не се делят между парчетата
+    runners = [RUNNERS[name] for name in names]
+    from stats import PowerAccumulator
+    startup = time.perf_counter() - _START
+    start = time.perf_counter()
+    for module in [m for name in names for m in MODULES[name]] + (["pipeline"] if streaming else []):
+        importlib.import_module(module)
+    imports = time.perf_counter() - start
+    print(json.dumps({"startup_s": round(startup, 4), "imports_s": round(imports, 4),
+                      "matplotlib_loaded": "matplotlib" in sys.modules}))
+
+    for name in args.inputs:
+        if streaming:
+            summary, (x_head, y_head) = run_stream(name, args)
+            if args.plot:
+                plot_dir = Path(args.plot)
+                plot_dir.mkdir(parents=True, exist_ok=True)
+                plot_path = plot_dir / f"{Path(name).stem}.{args.pipeline}.png"
+                title = f"{args.pipeline}: {name} (първите {x_head.shape[1]} проби)"
+                save_plot(plot_path, x_head, y_head, args.fs, title)
+                summary["plot"] = str(plot_path)
+            print(json.dumps(summary, ensure_ascii=False))
+            continue
+        x = load_signal(name)
+        start = time.perf_counter()
+        y = None
+        for runner in runners:
+            out = runner(x if y is None else y, args)
+            y = y if out is None else out  # rms без --window не променя сигнала
+        elapsed = time.perf_counter() - start
+        summary = {
+            "input": str(name),
+            "pipeline": args.pipeline,
+            "channels": len(x),
+            "samples": x.shape[1],
+            "seconds": round(elapsed, 4),
+            "rms_in": [PowerAccumulator().update(row).rms for row in x],
+        }
+        if y is not None:
+            summary["rms_out"] = [PowerAccumulator().update(row).rms for row in y]
+        if args.output:
+            out_dir = Path(args.output)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            if y is not None:
+                out_path = out_dir / f"{Path(name).stem}.{args.pipeline}.npy"
+                np.save(out_path, y[0] if len(y) == 1 else y)
+                summary["output"] = str(out_path)
+        if args.plot:
+            plot_dir = Path(args.plot)
+            plot_dir.mkdir(parents=True, exist_ok=True)
+            plot_path = plot_dir / f"{Path(name).stem}.{args.pipeline}.png"
+            save_plot(plot_path, x, y, args.fs, f"{args.pipeline}: {name}")
+            summary["plot"] = str(plot_path)
+        print(json.dumps(summary, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
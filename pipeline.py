@@ -0,0 +1,355 @@
+import numpy as np
+from filters import StreamingNotch
+from lms import MultichannelLMS, sinusoid_refs
+from spectral import StreamingFFTNotch
+from stats import PowerAccumulator, SlidingRMS
+from triac import GapFiller, triac_mask, periodic_triggers, triggers_in_range
+
+# === Поточен pipeline от етапи ===
+# Всеки етап пази състоянието си между парчетата и пише изхода си в буфер,
+# заделен от Pipeline веднъж (и увеличаван само при по-голямо парче), затова
+# обработката е с постоянна памет, независимо от дължината на потока.
+# Пример:
+#   chain = Pipeline(TriacMaskStage(fs), GapFillStage(), NotchStage([50, 100, 150], fs=fs),
+#                    PowerStage(), channels=4)
+#   for offset, chunk in recording.chunks():
+#       y = chain.process(chunk)
+#   y = chain.flush()
+#   chain.stages[-1].rms
+
+class Stage:
+    """
+    Етап на pipeline. Парчетата са (канали, проби); offset е номерът на първата
+    проба на парчето в потока (за референции и моменти на отпушване).
+    process() пише в out (канали, >= max_output(n)) и връща изглед към
+    записаната част – или самото x, ако етапът не променя пробите.
+    Етап може да задържи проби (напр. до цял кадър) и да ги върне по-късно,
+    но изходът е подравнен с входа и всички канали излизат с еднаква дължина.
+    """
+
+    def reset(self):
+        pass
+
+    def max_output(self, n):
+        """Горна граница на изходните проби за вход от n проби."""
+        return n
+
+    def max_flush(self):
+        """Горна граница на пробите, които flush() може да върне."""
+        return 0
+
+    def process(self, x, offset, out):
+        raise NotImplementedError
+
+    def flush(self, out):
+        """Задържаните проби в края на потока (в out); етапът започва нов поток."""
+        self.reset()
+        return out[:, :0]
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+class NotchStage(Stage):
+    """Причинна notch банка (filters.StreamingNotch) за всички канали."""
+
+    def __init__(self, freqs, Q=30.0, fs=1000, steady_start=True):
+        """
+        steady_start: в началото на потока филтърът започва в установен режим
+                      от първата проба (без преходен процес)
+        """
+        self.freqs = freqs
+        self.Q = Q
+        self.fs = fs
+        self.steady_start = steady_start
+        self.reset()
+
+    def reset(self):
+        self._notch = None
+
+    def process(self, x, offset, out):
+        if self._notch is None:
+            self._notch = StreamingNotch(self.freqs, self.Q, self.fs, channels=len(x))
+            if self.steady_start and x.shape[1]:
+                self._notch.reset(first=x[:, 0])
+        y = out[:, :x.shape[1]]
+        y[:] = self._notch.process(x)
+        return y
+
+class LMSStage(Stage):
+    """
+    Адаптивно потискане със синусоидални референции (lms.MultichannelLMS).
+    Референциите (sin и cos за всяка честота – смущения с произволна фаза) се
+    смятат от offset, така че фазата продължава между парчетата.
+    Изходът е грешката e = x - y (сигналът без смущенията).
+    """
+
+    def __init__(self, freqs, fs, mu=0.01, block_size=1, normalized=False):
+        self.freqs = np.asarray(freqs, dtype=float)
+        self.fs = fs
+        self.mu = mu
+        self.block_size = block_size
+        self.normalized = normalized
+        self.reset()
+
+    def reset(self):
+        self._engine = None
+        self._refs = np.empty((0, 2 * len(self.freqs)))
+
+    def process(self, x, offset, out):
+        n = x.shape[1]
+        if self._engine is None:
+            self._engine = MultichannelLMS(len(x), 2 * len(self.freqs), self.mu,
+                                           self.block_size, self.normalized)
+        if len(self._refs) < n:
+            self._refs = np.empty((n, 2 * len(self.freqs)))
+        refs = sinusoid_refs(self.freqs, n, self.fs, start=offset, out=self._refs[:n])
+        y = out[:, :n]
+        y[:], _ = self._engine.process(refs, x)
+        return y
+
+class FFTNotchStage(Stage):
+    """Зануляване на честоти в STFT кадри (spectral.StreamingFFTNotch) по канал."""
+
+    def __init__(self, freqs, fs, frame_size=256, width=None):
+        self.freqs = freqs
+        self.fs = fs
+        self.frame_size = frame_size
+        self.width = width
+        self.reset()
+
+    def reset(self):
+        self._notches = None
+
+    def max_output(self, n):
+        return n + self.frame_size
+
+    def process(self, x, offset, out):
+        if self._notches is None:
+            self._notches = [StreamingFFTNotch(self.freqs, self.fs, self.frame_size, self.width)
+                             for _ in range(len(x))]
+        m = 0
+        for c, notch in enumerate(self._notches):
+            row = notch.process(x[c])
+            m = len(row)  # Еднакво за всички канали – едни и същи дължини на входа
+            out[c, :m] = row
+        return out[:, :m]
+
+    def flush(self, out):
+        m = 0
+        if self._notches is not None:
+            for c, notch in enumerate(self._notches):
+                row = notch.flush()
+                m = len(row)
+                out[c, :m] = row
+        self.reset()
+        return out[:, :m]
+
+    def max_flush(self):
+        return self.frame_size
+
+class TriacMaskStage(Stage):
+    """
+    NaN в пробите след всеки момент на отпушване (triac.triac_mask с отместване).
+    trigger_times: сортирани моменти (s); None -> периодични от offset с rate в секунда.
+    """
+
+    def __init__(self, fs, window_ms=1, trigger_times=None, rate=100.0, offset=0.0):
+        self.fs = fs
+        self.window_ms = window_ms
+        self.trigger_times = None if trigger_times is None else np.sort(np.ravel(trigger_times))
+        self.rate = rate
+        self.offset = offset
+
+    def process(self, x, offset, out):
+        n = x.shape[1]
+        if self.trigger_times is None:
+            times = periodic_triggers(offset, n, self.fs, self.rate, self.offset, self.window_ms)
+        else:
+            times = triggers_in_range(self.trigger_times, offset, n, self.fs, self.window_ms)
+        y = out[:, :n]
+        y[:] = x
+        y[:, triac_mask(times, self.fs, n, self.window_ms, start=offset)] = np.nan
+        return y
+
+class GapFillStage(Stage):
+    """
+    Попълва NaN празнините (triac.GapFiller по канал). Празнина в края на
+    парчето се задържа до десния ѝ съсед; изходът на всички канали се
+    изравнява до най-късия, а остатъкът се пази за следващото парче.
+    """
+
+    def __init__(self, kind='linear'):
+        self.kind = kind
+        self.reset()
+
+    def reset(self):
+        self._fillers = None
+        self._backlog = None
+
+    def max_output(self, n):
+        if self._fillers is None:
+            return n
+        return n + max(len(b) + f.pending for b, f in zip(self._backlog, self._fillers))
+
+    def process(self, x, offset, out):
+        n = x.shape[1]
+        if self._fillers is None:
+            self._fillers = [GapFiller(self.kind) for _ in range(len(x))]
+            self._backlog = [np.empty(0) for _ in range(len(x))]
+        rows = []
+        for c, filler in enumerate(self._fillers):
+            out[c, :n] = x[c]
+            ready = filler.process(out[c, :n])  # На място в out
+            if len(self._backlog[c]):
+                ready = np.concatenate((self._backlog[c], ready))
+            rows.append(ready)
+        return self._emit(rows, min(len(r) for r in rows), out)
+
+    def _emit(self, rows, m, out):
+        for c, row in enumerate(rows):
+            self._backlog[c] = row[m:].copy()
+            out[c, :m] = row[:m]
+        return out[:, :m]
+
+    def flush(self, out):
+        m = 0
+        if self._fillers is not None:
+            rows = [np.concatenate((b, f.flush())) for b, f in zip(self._backlog, self._fillers)]
+            m = len(rows[0])
+            self._emit(rows, m, out)
+        self.reset()
+        return out[:, :m]
+
+    def max_flush(self):
+        return self.max_output(0)
+
+class RMSStage(Stage):
+    """RMS в плъзгащ се прозорец (stats.SlidingRMS) по канал; изходът е RMS за всяка проба."""
+
+    def __init__(self, window):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._sliding = None
+
+    def process(self, x, offset, out):
+        if self._sliding is None:
+            self._sliding = [SlidingRMS(self.window) for _ in range(len(x))]
+        y = out[:, :x.shape[1]]
+        for c, sliding in enumerate(self._sliding):
+            y[c] = sliding.process(x[c])
+        return y
+
+class PowerStage(Stage):
+    """
+    Натрупва средна стойност, мощност и RMS по канал (stats.PowerAccumulator)
+    и пропуска пробите без копиране. NaN пробите не се броят.
+    """
+
+    def __init__(self):
+        self.accumulators = None
+
+    def reset(self):
+        self.accumulators = None
+
+    def process(self, x, offset, out):
+        if self.accumulators is None:
+            self.accumulators = [PowerAccumulator() for _ in range(len(x))]
+        for acc, row in zip(self.accumulators, x):
+            acc.update(row)
+        return x
+
+    def flush(self, out):
+        return out[:, :0]  # Резултатите остават до reset()
+
+    @property
+    def power(self):
+        return np.array([acc.power for acc in self.accumulators or []])
+
+    @property
+    def rms(self):
+        return np.sqrt(self.power)
+
+class Pipeline:
+    """
+    Верига от етапи над поток от парчета. Изходът на всеки етап е буфер,
+    заделен веднъж за етапа; следващият етап чете от него, така че парче
+    минава през веригата без нови масиви с пълния размер на потока.
+    """
+
+    def __init__(self, *stages, channels=1):
+        """
+        stages: етапи (Stage) в реда на обработка
+        channels: брой канали; при 1 парчетата могат да са и 1-D
+        """
+        self.stages = list(stages)
+        self.channels = channels
+        self._buffers = [np.empty((channels, 0)) for _ in self.stages]
+        self.reset()
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+        self._offsets = [0] * len(self.stages)  # Проби, подадени на всеки етап досега
+        self._single = self.channels == 1  # Форма на изхода от flush() – като на последния вход
+
+    def _buffer(self, i, size):
+        if self._buffers[i].shape[1] < size:
+            self._buffers[i] = np.empty((self.channels, max(size, 2 * self._buffers[i].shape[1])))
+        return self._buffers[i]
+
+    def _run(self, x, first=0):
+        for i in range(first, len(self.stages)):
+            n = x.shape[1]
+            if n == 0:
+                break
+            stage = self.stages[i]
+            y = stage.process(x, self._offsets[i], self._buffer(i, stage.max_output(n)))
+            self._offsets[i] += n
+            x = y
+        return x
+
+    def _result(self, y, single, out):
+        if out is not None:
+            out = out[np.newaxis] if single else out
+            out[:, :y.shape[1]] = y
+            y = out[:, :y.shape[1]]
+        return y[0] if single else y
+
+    def process(self, x, out=None):
+        """
+        x: парче (channels, samples), или (samples,) при един канал
+        out: по избор масив за изхода (достатъчно дълъг, с формата на x); без
+             него се връща изглед към вътрешен буфер, валиден до следващото извикване
+        Връща готовите проби (може да са по-малко от входа при задържане).
+        """
+        x = np.asarray(x, dtype=float)
+        single = x.ndim == 1
+        if single:
+            x = x[np.newaxis]
+        if x.shape[0] != self.channels:
+            raise ValueError(f"Очаквани {self.channels} канала, получени {x.shape[0]}")
+        self._single = single
+        y = self._run(x)
+        if y.shape[1] == 0:
+            y = np.empty((self.channels, 0))
+        return self._result(y, single, out)
+
+    def flush(self, out=None):
+        """
+        Изпразва задържаните проби етап по етап (всеки остатък минава през
+        следващите етапи, преди те да бъдат изпразнени) и започва нов поток.
+        Връща остатъка като нов масив (или в out).
+        """
+        parts = []
+        for i, stage in enumerate(self.stages):
+            tail = stage.flush(self._buffer(i, stage.max_flush()))
+            if tail.shape[1]:
+                parts.append(self._run(tail, i + 1).copy())
+        y = np.concatenate(parts, axis=1) if parts else np.empty((self.channels, 0))
+        self._offsets = [0] * len(self.stages)
+        return self._result(y, self._single, out)
+
+    def __repr__(self):
+        return f"Pipeline({', '.join(map(repr, self.stages))}, channels={self.channels})"
@@ -0,0 +1,101 @@
+from pathlib import Path
+import numpy as np
+
+# --- Запис от АЦП, четен на парчета от диска ---
+class Recording:
+    """
+    Суров двоичен запис (напр. int16/float32 от АЦП), отворен с np.memmap.
+    Нищо не се чете предварително: read() и chunks() преобразуват само исканите
+    проби в float64 (умножени по scale), така че паметта не зависи от размера
+    на файла – операционната система освобождава прочетените страници сама.
+    """
+
+    def __init__(self, path, dtype='int16', channels=1, fs=1000.0, scale=1.0,
+                 layout='interleaved', header_bytes=0):
+        """
+        path: файл със сурови проби
+        dtype: тип на пробите във файла (напр. 'int16', '<f4')
+        channels: брой канали
+        fs: честота на дискретизация (Hz)
+        scale: множител от единици на АЦП към физически единици
+        layout: 'interleaved' – кадри [к0 к1 ... к0 к1 ...] (обичайно за АЦП);
+                'planar' – всички проби на канал 0, после на канал 1, ...
+        header_bytes: байтове заглавие преди първата проба
+        Непълен последен кадър (прекъснат запис) се пропуска.
+        """
+        if layout not in ('interleaved', 'planar'):
+            raise ValueError(f"Непозната подредба: {layout}")
+        self.path = Path(path)
+        self.channels = channels
+        self.fs = float(fs)
+        self.scale = scale
+        self.layout = layout
+        raw = np.memmap(self.path, dtype=np.dtype(dtype), mode='r', offset=header_bytes)
+        self.samples = len(raw) // channels
+        raw = raw[:self.samples * channels]
+        # Изглед (канали, проби) без копиране; при interleaved е с крачка channels
+        if layout == 'interleaved':
+            self._data = raw.reshape(self.samples, channels).T
+        else:
+            self._data = raw.reshape(channels, self.samples)
+
+    @classmethod
+    def from_npy(cls, path, fs, scale=1.0):
+        """
+        .npy файл, отворен с mmap_mode='r'; (проби,) или (канали, проби).
+        """
+        data = np.load(path, mmap_mode='r')
+        if data.ndim == 1:
+            data = data[np.newaxis]
+        rec = cls.__new__(cls)
+        rec.path = Path(path)
+        rec.channels, rec.samples = data.shape
+        rec.fs = float(fs)
+        rec.scale = scale
+        rec.layout = 'planar'
+        rec._data = data
+        return rec
+
+    @property
+    def duration(self):
+        """Продължителност в секунди."""
+        return self.samples / self.fs
+
+    def read(self, start=0, stop=None, out=None):
+        """
+        Връща пробите [start, stop) като float64 масив (канали, проби), умножени по scale.
+        out: по избор предварително заделен масив (канали, >= stop - start);
+             записва се в началото му и се връща изглед към записаната част.
+        """
+        stop = self.samples if stop is None else min(stop, self.samples)
+        start = min(max(start, 0), stop)
+        raw = self._data[:, start:stop]
+        if out is None:
+            out = np.empty((self.channels, stop - start))
+        else:
+            out = out[:, :stop - start]
+        np.multiply(raw, self.scale, out=out)
+        return out
+
+    def chunks(self, chunk_size=1 << 18, start=0, stop=None, out=None):
+        """
+        Генерира (offset, парче) за пробите [start, stop), където парчето е
+        (канали, проби) float64, а offset – номерът на първата му проба във файла.
+        Границите на парчетата са кратни на chunk_size от началото на записа,
+        така че при различно start те съвпадат (първото парче може да е по-късо).
+        out: буфер (канали, chunk_size), който се използва за всяко парче;
+             тогава парчето е валидно само до следващата итерация.
+        """
+        stop = self.samples if stop is None else min(stop, self.samples)
+        offset = start
+        while offset < stop:
+            end = min((offset // chunk_size + 1) * chunk_size, stop)
+            yield offset, self.read(offset, end, out)
+            offset = end
+
+    def __len__(self):
+        return self.samples
+
+    def __repr__(self):
+        return (f"Recording({str(self.path)!r}, channels={self.channels}, samples={self.samples}, "
+                f"fs={self.fs}, dtype={self._data.dtype}, layout={self.layout!r})")
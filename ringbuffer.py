@@ -0,0 +1,168 @@
+import numpy as np
+from collections import deque
+
+class RingBuffer:
+    """
+    Fixed-length sample buffer for live plots.
+
+    Samples are written twice, at i and i + capacity, into a preallocated array of
+    twice the capacity, so the last `capacity` samples are always one contiguous
+    slice (oldest first) that can be handed to line.set_ydata without copying.
+    The running min/max is kept with monotonic queues: amortized O(1) per sample
+    instead of the O(N) min(data)/max(data) scan.
+    """
+
+    def __init__(self, capacity, fill=0.0, dtype=float):
+        """
+        :param capacity: Number of most recent samples kept.
+        :param fill: Initial value of every slot (like deque([fill] * N, maxlen=N)).
+        :param dtype: Sample dtype.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._buffer = np.full(2 * capacity, fill, dtype=dtype)
+        self._pos = 0  # Next write index in [0, capacity)
+        self._count = capacity  # Total samples seen, the initial fill included
+        # (sample number, value) pairs; values increase (min) / decrease (max) from the front
+        self._min_queue = deque([(capacity - 1, self._buffer[0])])
+        self._max_queue = deque([(capacity - 1, self._buffer[0])])
+
+    def __len__(self):
+        return self.capacity
+
+    def append(self, value):
+        """Add one sample, dropping the oldest one."""
+        pos = self._pos
+        self._buffer[pos] = value
+        self._buffer[pos + self.capacity] = value
+        self._pos = (pos + 1) % self.capacity
+        self._push(self._buffer[pos])
+
+    def extend(self, values):
+        """Add a batch of samples, dropping as many of the oldest ones."""
+        values = np.asarray(values, dtype=self._buffer.dtype).ravel()
+        n = len(values)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the last `capacity` samples survive; rebuild from scratch
+            values = values[-self.capacity:]
+            self._buffer[:self.capacity] = values
+            self._buffer[self.capacity:] = values
+            self._pos = 0
+            self._count += n - self.capacity
+            self._min_queue.clear()
+            self._max_queue.clear()
+            for value in values:
+                self._push(value)
+            return
+
+        pos = self._pos
+        first = min(n, self.capacity - pos)
+        # Both copies of each slot, split where the write position wraps around
+        self._buffer[pos:pos + first] = values[:first]
+        self._buffer[pos + self.capacity:pos + self.capacity + first] = values[:first]
+        if first < n:
+            rest = n - first
+            self._buffer[:rest] = values[first:]
+            self._buffer[self.capacity:self.capacity + rest] = values[first:]
+        self._pos = (pos + n) % self.capacity
+        for value in values:
+            self._push(value)
+
+    def _push(self, value):
+        self._count += 1
+        index = self._count - 1
+        oldest = self._count - self.capacity
+
+        min_queue = self._min_queue
+        while min_queue and min_queue[-1][1] >= value:
+            min_queue.pop()
+        min_queue.append((index, value))
+        while min_queue[0][0] < oldest:
+            min_queue.popleft()
+
+        max_queue = self._max_queue
+        while max_queue and max_queue[-1][1] <= value:
+            max_queue.pop()
+        max_queue.append((index, value))
+        while max_queue[0][0] < oldest:
+            max_queue.popleft()
+
+    def view(self):
+        """Read-only view of the buffer contents, oldest sample first (no copy)."""
+        view = self._buffer[self._pos:self._pos + self.capacity]
+        view.flags.writeable = False
+        return view
+
+    def min(self):
+        return self._min_queue[0][1]
+
+    def max(self):
+        return self._max_queue[0][1]
+
+class MultiChannelRingBuffer:
+    """
+    Fixed-length buffer for several channels sampled together.
+
+    Same doubled layout as RingBuffer with one row per channel, so the last
+    `capacity` samples of all channels are a single (channels, capacity) slice.
+    A frame then updates every channel with one vectorized operation instead of
+    one call per channel. Min/max are computed per channel from the view; at
+    plot sizes that one reduction is cheaper than per-sample monotonic queues.
+    """
+
+    def __init__(self, channels, capacity, fill=0.0, dtype=float):
+        """
+        :param channels: Number of channels (rows).
+        :param capacity: Number of most recent samples kept per channel.
+        :param fill: Initial value of every slot.
+        :param dtype: Sample dtype.
+        """
+        if channels < 1 or capacity < 1:
+            raise ValueError("channels and capacity must be at least 1")
+        self.channels = channels
+        self.capacity = capacity
+        self._buffer = np.full((channels, 2 * capacity), fill, dtype=dtype)
+        self._pos = 0  # Next write column in [0, capacity)
+
+    def __len__(self):
+        return self.capacity
+
+    def extend(self, values):
+        """Add a (channels, n) batch, dropping as many of the oldest samples."""
+        values = np.asarray(values, dtype=self._buffer.dtype).reshape(self.channels, -1)
+        n = values.shape[1]
+        if n == 0:
+            return
+        if n >= self.capacity:
+            values = values[:, -self.capacity:]
+            self._buffer[:, :self.capacity] = values
+            self._buffer[:, self.capacity:] = values
+            self._pos = 0
+            return
+
+        pos = self._pos
+        first = min(n, self.capacity - pos)
+        self._buffer[:, pos:pos + first] = values[:, :first]
+        self._buffer[:, pos + self.capacity:pos + self.capacity + first] = values[:, :first]
+        if first < n:
+            rest = n - first
+            self._buffer[:, :rest] = values[:, first:]
+            self._buffer[:, self.capacity:self.capacity + rest] = values[:, first:]
+        self._pos = (pos + n) % self.capacity
+
+    def view(self):
+        """Read-only (channels, capacity) view, oldest sample first (no copy)."""
+        view = self._buffer[:, self._pos:self._pos + self.capacity]
+        view.flags.writeable = False
+        return view
+
+    def min(self):
+        """Per-channel minimum over the buffer contents."""
+        return self.view().min(axis=1)
+
+    def max(self):
+        """Per-channel maximum over the buffer contents."""
+        return self.view().max(axis=1)
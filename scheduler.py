@@ -0,0 +1,78 @@
+import math
+import time
+
+class FrameScheduler:
+    """
+    Decide when to draw the next frame, independently of the sample rate.
+
+    Frames are placed on a grid with a period of 1 / target_fps. The period is
+    stretched when the measured draw time (smoothed) plus some headroom for
+    the GUI's own events does not fit in it, and shrinks back once drawing is
+    fast again. When a frame overruns its slot, the missed slots are skipped
+    (counted in `skipped`) instead of being drawn late back to back. Samples
+    are not lost: the next frame draws everything that arrived meanwhile.
+    """
+
+    def __init__(self, target_fps=60.0, min_fps=30.0, headroom=0.5, smoothing=0.1,
+                 clock=time.perf_counter):
+        """
+        :param target_fps: Frame rate aimed for when drawing is fast enough.
+        :param min_fps: Below this rate the slowdown is reported by `behind`.
+        :param headroom: Fraction of the draw time kept free for other GUI events.
+        :param smoothing: Weight of the latest draw time in its moving average.
+        :param clock: Time source in seconds.
+        """
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Start a new schedule with the first frame due now."""
+        self.interval = 1.0 / self.target_fps  # Current frame period (seconds)
+        self.draw_time = 0.0  # Smoothed draw time (seconds)
+        self.frames = 0
+        self.skipped = 0  # Frame slots given up because drawing overran
+        self._next = self.clock()
+
+    @property
+    def behind(self):
+        """True if drawing is too slow for min_fps."""
+        return self.interval > 1.0 / self.min_fps
+
+    def frame(self, draw):
+        """
+        Run draw() now and schedule the next frame.
+        :return: Seconds to wait (handling GUI events) before calling frame() again.
+        """
+        start = self.clock()
+        draw()
+        now = self.clock()
+        return self.done(now - start, now)
+
+    def done(self, draw_time, now=None):
+        """
+        Record a frame drawn elsewhere that took draw_time seconds.
+        :return: Seconds until the next frame is due.
+        """
+        now = self.clock() if now is None else now
+        self.frames += 1
+        if self.frames == 1:
+            self.draw_time = draw_time
+        else:
+            self.draw_time += self.smoothing * (draw_time - self.draw_time)
+        self.interval = max(1.0 / self.target_fps, self.draw_time * (1 + self.headroom))
+
+        self._next += self.interval
+        if self._next < now:
+            missed = math.floor((now - self._next) / self.interval) + 1
+            self.skipped += missed
+            self._next += missed * self.interval
+        return self._next - now
+
+    def status(self):
+        """Short text for FPS reports."""
+        return (f"interval {1000 * self.interval:.1f} ms, draw {1000 * self.draw_time:.1f} ms, "
+                f"skipped {self.skipped}" + (", below min FPS" if self.behind else ""))
@@ -0,0 +1,201 @@
+from functools import lru_cache
+import numpy as np
+
+# --- Кеширани прозорци и маски ---
+@lru_cache(maxsize=16)
+def sqrt_hann(frame_size):
+    """
+    Корен от периодичен Hann прозорец. Приложен при анализ и при синтез с
+    припокриване 50%, сумата от квадратите му е 1 -> точно възстановяване.
+    """
+    return np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame_size) / frame_size))
+
+@lru_cache(maxsize=64)
+def _notch_mask(frame_size, fs, notch_freqs, width):
+    freqs = np.fft.rfftfreq(frame_size, d=1/fs)
+    mask = np.ones(len(freqs))
+    for f in notch_freqs:
+        mask[np.abs(freqs - f) < width] = 0.0
+        mask[np.argmin(np.abs(freqs - f))] = 0.0  # Поне най-близкият bin при груба резолюция
+    return mask
+
+def notch_mask(frame_size, fs, notch_freqs, width=1.0):
+    """
+    Множител за rfft спектъра (0 около notch честотите, 1 другаде).
+    Кешира се по (frame_size, fs, notch_freqs, width) – не трябва да се променя.
+    """
+    return _notch_mask(int(frame_size), float(fs), tuple(float(f) for f in notch_freqs), float(width))
+
+# --- Поточен FFT notch (STFT с overlap-add) ---
+class StreamingFFTNotch:
+    """
+    Зануляване на честоти в спектъра на кадри от frame_size проби с припокриване
+    50% и корен от Hann прозорец (анализ + синтез), вместо една FFT на целия запис.
+    Паметта не зависи от дължината на записа, а закъснението е до един кадър.
+    Изходът е подравнен с входа: process() връща готовите проби, flush() – остатъка.
+    """
+
+    def __init__(self, notch_freqs, fs, frame_size=256, width=None):
+        """
+        notch_freqs: честоти за премахване (Hz)
+        fs: честота на дискретизация (Hz)
+        frame_size: дължина на кадъра (четна); резолюцията е fs / frame_size
+        width: зануляват се бинове с |f - notch| < width (и винаги най-близкият);
+               None -> 3 бина, колкото е нужно при прозореца да не остане изтичане
+        """
+        if frame_size % 2:
+            raise ValueError("frame_size трябва да е четно")
+        self.frame_size = frame_size
+        self.hop = frame_size // 2
+        self.window = sqrt_hann(frame_size)
+        if width is None:
+            width = 3 * fs / frame_size
+        self.mask = notch_mask(frame_size, fs, notch_freqs, width)
+        self._frame = np.zeros(frame_size)  # [предишен hop, текущ hop] от входа
+        # Буфери за FFT, използвани за всеки кадър (out= изисква NumPy >= 2.0)
+        self._work = np.empty(frame_size)
+        self._spectrum = np.empty(frame_size // 2 + 1, dtype=complex)
+        self._ola = np.zeros(frame_size)  # Натрупване при overlap-add
+        self.reset()
+
+    @property
+    def latency(self):
+        """Закъснение в проби между вход и изход (без буферирането до цял hop)."""
+        return self.hop
+
+    def reset(self):
+        self._frame[:] = 0.0
+        self._ola[:] = 0.0
+        self._fill = 0  # Проби в текущия hop
+        self._skip = self.hop  # Първите изходи са преди началото на потока
+        self._n_in = 0
+        self._n_out = 0
+
+    def _next_frame(self, out):
+        """Обработва пълния кадър и записва готовите hop проби в out."""
+        hop = self.hop
+        np.multiply(self._frame, self.window, out=self._work)
+        np.fft.rfft(self._work, out=self._spectrum)
+        self._spectrum *= self.mask
+        np.fft.irfft(self._spectrum, n=self.frame_size, out=self._work)
+        self._work *= self.window
+        self._ola += self._work
+        out[:] = self._ola[:hop]
+        self._ola[:hop] = self._ola[hop:]
+        self._ola[hop:] = 0.0
+        self._frame[:hop] = self._frame[hop:]
+
+    def process(self, samples):
+        """
+        samples: следващото парче от потока (1-D, произволна дължина)
+        Връща готовите изходни проби.
+        """
+        samples = np.asarray(samples, dtype=float)
+        self._n_in += len(samples)
+        hop = self.hop
+        out = np.empty((self._fill + len(samples)) // hop * hop)  # Изходът на всички пълни кадри
+        done = 0
+        pos = 0
+        while pos < len(samples):
+            take = min(hop - self._fill, len(samples) - pos)
+            start = hop + self._fill
+            self._frame[start:start + take] = samples[pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == hop:
+                self._next_frame(out[done:done + hop])
+                done += hop
+                self._fill = 0
+        skip = min(self._skip, len(out))
+        self._skip -= skip
+        out = out[skip:]
+        self._n_out += len(out)
+        return out
+
+    def flush(self):
+        """Връща оставащите проби в края на потока и започва нов поток."""
+        remaining = self._n_in - self._n_out
+        n_in = self._n_in
+        out = self.process(np.zeros(self.hop - self._fill + self.hop))
+        self._n_in = n_in
+        out = out[:remaining]
+        self.reset()
+        return out
+
+# --- Осреднен спектър (Welch) ---
+@lru_cache(maxsize=16)
+def _welch_setup(nperseg, fs):
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(nperseg) / nperseg)  # Периодичен Hann
+    if nperseg == 1:
+        window = np.ones(1)  # Както scipy.signal.get_window('hann', 1)
+    freqs = np.fft.rfftfreq(nperseg, d=1/fs)
+    return window, freqs
+
+def _segment_power(sig, nperseg, step, window):
+    """Сума на |rfft|^2 по сегментите и броят им; sig е (..., samples)."""
+    segments = np.lib.stride_tricks.sliding_window_view(sig, nperseg, axis=-1)[..., ::step, :]
+    spectra = np.fft.rfft(segments * window, axis=-1)
+    return np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=-2), segments.shape[-2]
+
+def _amplitude(power_sum, count, window):
+    # Синусоида с амплитуда A дава връх A/2, както |rfft| / N на целия сигнал
+    return np.sqrt(power_sum / max(count, 1)) / np.sum(window)
+
+def welch_spectrum(signals, fs, nperseg=256, overlap=0.5):
+    """
+    signals: (samples,) или (signals, samples) – всички се смятат с едно извикване
+    nperseg: дължина на сегмента; резолюцията е fs / nperseg. Сигнал, по-къс от
+             сегмента, е един сегмент с дължината си (както scipy.signal.welch)
+    overlap: припокриване на сегментите (0 <= overlap < 1)
+    Връща (freqs, amplitude) – амплитуден спектър, осреднен по мощност на сегментите.
+    """
+    signals = np.asarray(signals, dtype=float)
+    nperseg = max(min(int(nperseg), signals.shape[-1]), 1)
+    window, freqs = _welch_setup(int(nperseg), float(fs))
+    step = max(int(nperseg * (1 - overlap)), 1)
+    power_sum, count = _segment_power(signals, nperseg, step, window)
+    return freqs, _amplitude(power_sum, count, window)
+
+class WelchAccumulator:
+    """
+    Welch спектър, който се натрупва от парчета: всеки нов сегмент се добавя
+    към сумата, а непълният край се пази за следващото парче.
+    """
+
+    def __init__(self, fs, nperseg=256, overlap=0.5, channels=None):
+        """
+        channels: None за един сигнал (1-D парчета), иначе брой редове в парчетата
+        """
+        self.fs = fs
+        self.nperseg = nperseg
+        self.step = max(int(nperseg * (1 - overlap)), 1)
+        self.window, self.freqs = _welch_setup(int(nperseg), float(fs))
+        shape = () if channels is None else (channels,)
+        self._tail = np.empty(shape + (0,))
+        self._power_sum = np.zeros(shape + (len(self.freqs),))
+        self.count = 0  # Осреднени сегменти
+
+    def update(self, chunk):
+        """chunk: (samples,) или (channels, samples)"""
+        data = np.concatenate((self._tail, np.asarray(chunk, dtype=float)), axis=-1)
+        if data.shape[-1] < self.nperseg:
+            self._tail = data
+            return
+        power_sum, count = _segment_power(data, self.nperseg, self.step, self.window)
+        self._power_sum += power_sum
+        self.count += count
+        # Следващият сегмент започва count * step проби след началото
+        self._tail = data[..., count * self.step:]
+
+    def spectrum(self):
+        """Връща (freqs, amplitude) за всичко натрупано досега."""
+        return self.freqs, _amplitude(self._power_sum, self.count, self.window)
+
+def plot_spectrum(ax, signals, fs, labels, nperseg=256):
+    """
+    Рисува осреднения спектър на няколко сигнала с едно изчисление.
+    signals: списък/масив от сигнали с еднаква дължина
+    """
+    freqs, spectra = welch_spectrum(np.vstack(signals), fs, nperseg)
+    for spectrum, label in zip(spectra, labels):
+        ax.plot(freqs, spectrum, label=label)
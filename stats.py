@@ -0,0 +1,118 @@
+import numpy as np
+
+# --- Натрупване на средна стойност, мощност и RMS ---
+class PowerAccumulator:
+    """
+    Средна стойност, мощност (средно на x^2) и RMS, натрупвани от парчета.
+    Пази брой, средно и сума от квадратите на отклоненията (Welford/Chan),
+    което е числено устойчиво и позволява сливане на частични резултати от
+    паралелни обработки. NaN и маскираните проби се пропускат.
+    Парчетата се обработват на блокове, така че временните масиви са с
+    ограничен размер вместо пълно копие x**2.
+    """
+
+    block_size = 65536
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Сума от (x - mean)^2
+
+    def _add(self, n, mean, m2):
+        """Слива статистики (n, mean, m2) в текущите (формула на Chan)."""
+        if n == 0:
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    def update(self, samples, mask=None):
+        """
+        samples: парче (произволна форма); numpy.ma масивите се уважават
+        mask: по избор – True за проби, които да се пропуснат
+        """
+        if np.ma.isMaskedArray(samples):
+            extra = np.ma.getmaskarray(samples)
+            mask = extra if mask is None else (extra | mask)
+            samples = samples.data
+        samples = np.asarray(samples, dtype=float).ravel()
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool).ravel()
+        for start in range(0, len(samples), self.block_size):
+            block = samples[start:start + self.block_size]
+            skip = np.isnan(block)
+            if mask is not None:
+                skip |= mask[start:start + self.block_size]
+            if skip.any():
+                block = block[~skip]
+            n = len(block)
+            if n == 0:
+                continue
+            mean = block.sum() / n
+            deviation = block - mean
+            self._add(n, mean, float(np.dot(deviation, deviation)))
+        return self
+
+    def merge(self, other):
+        """Добавя частичен резултат от друг акумулатор (напр. от друг процес)."""
+        self._add(other.count, other.mean, other.m2)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def power(self):
+        """Средна мощност mean(x^2) = дисперсия + mean^2."""
+        return self.variance + self.mean ** 2 if self.count else np.nan
+
+    @property
+    def rms(self):
+        return np.sqrt(self.power)
+
+# --- Функции за цял сигнал ---
+def mean_power(samples):
+    return PowerAccumulator().update(samples).power
+
+def power(x): return mean_power(x)
+def rms(x): return np.sqrt(power(x))
+
+# --- RMS в плъзгащ се прозорец ---
+class SlidingRMS:
+    """
+    RMS на последните window проби за всяка нова проба (O(1) на проба),
+    за показване на живо. NaN пробите не се броят; в началото на потока
+    прозорецът съдържа само наличните проби.
+    Текущите суми на x² и на броя валидни проби са в два MovingAverage
+    (кръгов буфер + сума), така че едно извикване струва пропорционално на
+    новите проби, независимо от window.
+    """
+
+    def __init__(self, window):
+        from filters import MovingAverage  # filters внася scipy; акумулаторите не го изискват
+        self.window = window
+        # Сумата на x² се преизчислява от буфера на всеки window проби: иначе
+        # след голям импулс грешката при закръгляне остава в сумата и RMS на
+        # по-слаб сигнал след него е грешен (или отрицателен под корена)
+        self._squares = MovingAverage(window, mode='full', renorm_interval=window)
+        self._valid = MovingAverage(window, mode='full')
+
+    def process(self, samples):
+        """
+        samples: следващото парче (1-D)
+        Връща RMS за всяка проба от парчето (NaN, ако прозорецът е празен).
+        """
+        samples = np.asarray(samples, dtype=float)
+        valid = ~np.isnan(samples)
+        squares = np.where(valid, samples, 0.0)
+        squares *= squares
+        mean_square = self._squares.process(squares)
+        fraction = self._valid.process(valid.astype(float))
+        np.maximum(mean_square, 0.0, out=mean_square)  # Остатъчна грешка от закръгляне
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.sqrt(mean_square / fraction)
+        out[fraction < 0.5 / self.window] = np.nan  # Няма нито една валидна проба
+        return out
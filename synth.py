@@ -0,0 +1,173 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from triac import trigger_windows
+
+# --- Синтетичен сигнал на парчета ---
+class SignalGenerator:
+    """
+    Измерен сигнал като в meas*: постоянна стойност + синусоиди (50 Hz и
+    хармоници) + гаусов шум + импулси от триак, генериран на парчета с
+    произволна дължина. Фазата продължава между парчетата, а шумът и импулсите
+    зависят само от seed, не от разделянето на парчета и броя нишки:
+    шумът на канал c в блок k от noise_block проби идва от собствен поток
+    SeedSequence(seed, spawn_key=(c, k)).
+
+    Синусоидите се смятат с формулата за сбор на ъгли: за ред от
+    табличните cos/sin стойности всички честоти и постоянната стойност са едно
+    матрично умножение (вместо np.sin за всяка честота и проба).
+    threads > 1: пълните блокове се пълнят паралелно (numpy освобождава GIL).
+    """
+
+    noise_block = 65536  # Проби на канал в един поток на шума
+    _row = 1024  # Колони на таблицата за сбора на ъгли
+
+    def __init__(self, fs, dc=1.0, tones=((50, 0.3), (100, 0.2), (150, 0.1)), noise_std=0.05,
+                 triac_rate=0.0, triac_offset=0.002, spike_width_ms=1, spike_amp=5,
+                 channels=None, seed=None, threads=1, dtype=float):
+        """
+        fs: честота на дискретизация (Hz)
+        dc: постоянна стойност на полезния сигнал
+        tones: (честота Hz, амплитуда) за всяка синусоида, обща за всички канали
+        noise_std: стандартно отклонение на шума (независим по канали)
+        triac_rate: моменти на отпушване в секунда (0 – без импулси), от triac_offset (s)
+        spike_width_ms, spike_amp: като в triac.add_triac_spikes
+        channels: None за един сигнал (парчета (n,)), иначе брой канали ((channels, n))
+        seed: int за възпроизводим сигнал; None – случаен
+        threads: нишки за пълнене на парчетата
+        dtype: float64 или float32
+        """
+        self.fs = float(fs)
+        self.dc = dc
+        self.tones = [(float(f), float(a)) for f, a in tones]
+        self.noise_std = noise_std
+        self.triac_rate = triac_rate
+        self.triac_offset = triac_offset
+        self.spike_width_ms = spike_width_ms
+        self.spike_amp = spike_amp
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.seed = np.random.SeedSequence(seed).entropy  # Фиксира случайния seed при None
+        self.threads = threads
+        self._pool = ThreadPoolExecutor(threads) if threads > 1 else None
+
+        # Таблица [cos; sin; 1] за отместванията в един ред, (2K + 1, _row)
+        freqs = np.array([f for f, _ in self.tones])
+        angle = 2 * np.pi * freqs[:, np.newaxis] * np.arange(self._row) / self.fs
+        self._table = np.vstack((np.cos(angle), np.sin(angle), np.ones((1, self._row)))).astype(self.dtype)
+        self._freqs = freqs
+        self._amps = np.array([a for _, a in self.tones])
+        self.reset()
+
+    def reset(self):
+        """Връща генератора в началото на потока (същият seed -> същият сигнал)."""
+        self.position = 0  # Номер на следващата проба
+        self._phase = np.zeros(len(self.tones))  # Фаза на всяка синусоида в цикли, [0, 1)
+        self._cache = {}  # Канал -> (блок, шум) за непълно използван блок
+        self._spikes = np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(1 << 32,)))
+        self._next_trigger = 0
+        self._pending = (np.empty(0, dtype=np.int64), np.empty((self._n_channels, 0)))
+
+    @property
+    def _n_channels(self):
+        return 1 if self.channels is None else self.channels
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def generate(self, n, out=None):
+        """
+        Връща следващите n проби: (n,) или (channels, n).
+        out: по избор масив с тази форма и dtype, който се попълва.
+        """
+        C = self._n_channels
+        shape = (n,) if self.channels is None else (C, n)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape:
+            raise ValueError(f"Очаквана форма {shape}, получена {out.shape}")
+        block = out.reshape(C, n)
+
+        # Сегменти по границите на блоковете на шума; пълните се пълнят паралелно
+        B = self.noise_block
+        edges = np.arange((self.position // B + 1) * B, self.position + n, B) - self.position
+        edges = np.concatenate(([0], edges, [n])).astype(np.int64)
+        segments = list(zip(edges[:-1], edges[1:]))
+        full = [s for s in segments if s[1] - s[0] == B]
+        partial = [s for s in segments if s[1] - s[0] != B]
+        if self._pool is not None and len(full) > 1:
+            list(self._pool.map(lambda s: self._fill(block, *s), full))
+        else:
+            for s in full:
+                self._fill(block, *s)
+        for s in partial:
+            self._fill(block, *s)
+
+        if self.triac_rate:
+            self._add_spikes(block)
+        self._phase = (self._phase + self._freqs * n / self.fs) % 1.0
+        self.position += n
+        return out
+
+    __call__ = generate  # Може да се подаде направо като source на AcquisitionThread
+
+    def _fill(self, block, lo, hi):
+        """Синусоиди + DC + шум за проби [lo, hi) от парчето, всички канали."""
+        out = block[:, lo:hi]
+        n = hi - lo
+        tones = self._tones(lo, n)
+        B = self.noise_block
+        k, start = divmod(self.position + lo, B)
+        for c in range(len(block)):
+            if n == B:
+                self._noise(c, k, out=out[c])
+            else:
+                noise = self._cache.get(c)
+                if noise is None or noise[0] != k:
+                    noise = (k, self._noise(c, k))
+                    self._cache[c] = noise
+                out[c] = noise[1][start:start + n]
+            out[c] *= self.noise_std
+            out[c] += tones
+
+    def _noise(self, c, k, out=None):
+        rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(c, k))))
+        return rng.standard_normal(self.noise_block, dtype=self.dtype, out=out)
+
+    def _tones(self, lo, n):
+        """Сумата на синусоидите и dc за n проби от позиция lo на парчето."""
+        L = self._row
+        rows = -(-n // L)
+        # Фаза в началото на всеки ред: sin(a + b) = sin a cos b + cos a sin b
+        phase = self._phase + self._freqs * lo / self.fs
+        start = 2 * np.pi * (phase + self._freqs * (np.arange(rows)[:, np.newaxis] * L) / self.fs)
+        coeffs = np.hstack((self._amps * np.sin(start), self._amps * np.cos(start),
+                            np.full((rows, 1), self.dc))).astype(self.dtype)
+        return (coeffs @ self._table).ravel()[:n]
+
+    def _add_spikes(self, block):
+        """Импулси след всеки момент на отпушване; продължават в следващото парче."""
+        C, n = block.shape
+        width = int(self.spike_width_ms * self.fs / 1000)
+        end = self.position + n
+        step = 1 / self.triac_rate
+        # Нови моменти, които започват преди края на парчето
+        last = int(np.ceil((end / self.fs - self.triac_offset) / step)) + 1
+        times = self.triac_offset + np.arange(self._next_trigger, max(last, self._next_trigger)) * step
+        starts, _ = trigger_windows(times, self.fs, self.spike_width_ms)
+        times = times[starts < end]
+        starts = starts[starts < end]
+        self._next_trigger += len(times)
+        index = (starts[:, np.newaxis] + np.arange(width)).ravel()
+        values = self.spike_amp * self._spikes.standard_normal((len(starts), C, width))
+        values = values.transpose(1, 0, 2).reshape(C, -1)
+
+        index = np.concatenate((self._pending[0], index))
+        values = np.concatenate((self._pending[1], values), axis=1)
+        now = (index >= self.position) & (index < end)
+        later = index >= end
+        self._pending = (index[later], values[:, later])
+        # np.add.at натрупва и при припокриващи се импулси
+        for c in range(C):
+            np.add.at(block[c], index[now] - self.position, values[c, now].astype(self.dtype))
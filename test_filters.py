@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from filters import MovingAverage, moving_average_filter
+
+MODES = ["valid", "same", "full"]
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("n", [1, 2, 3, 6, 7, 8, 50])
+def test_moving_average_filter_matches_convolve(mode, n):
+    # Включително n < window_size, където np.convolve разменя аргументите
+    window = 7
+    x = np.random.default_rng(n).standard_normal(n)
+    expected = np.convolve(x, np.ones(window) / window, mode)
+    np.testing.assert_allclose(moving_average_filter(x, window, mode), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_moving_average_empty(mode):
+    assert len(moving_average_filter(np.zeros(0), 7, mode)) == 0
+    ma = MovingAverage(7, mode)
+    assert len(ma.process(np.zeros(0))) == 0
+    assert len(ma.flush()) == 0
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_moving_average_chunks(mode):
+    window = 7
+    x = np.random.default_rng(0).standard_normal(1000)
+    ma = MovingAverage(window, mode, renorm_interval=64)
+    y = np.concatenate([ma.process(part) for part in np.array_split(x, 13)] + [ma.flush()])
+    np.testing.assert_allclose(y, np.convolve(x, np.ones(window) / window, mode), atol=1e-12)
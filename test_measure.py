@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+MEASURE = Path(__file__).with_name("measure.py")
+
+
+@pytest.mark.parametrize("pipeline", [["notch"], ["rms", "--window", "100"]])
+def test_first_file_timing_excludes_imports(tmp_path, pipeline):
+    # Нов интерпретатор – импортите (scipy) не са заредени отпреди. Времето на
+    # първия запис трябва да е като на следващите, а импортите – в imports_s.
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"rec{i}.npy")
+        np.save(paths[-1], rng.standard_normal((2, 20000)))
+    result = subprocess.run([sys.executable, str(MEASURE), *pipeline, "--fs", "10000", *map(str, paths)],
+                            capture_output=True, text=True, check=True, cwd=MEASURE.parent)
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    seconds = [line["seconds"] for line in lines[1:]]
+    assert len(seconds) == 3
+    assert seconds[0] < 0.1 + 3 * min(seconds[1:])
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from stats import SlidingRMS
+
+
+@pytest.mark.parametrize("tail", [0.0, 1e-3])
+@pytest.mark.parametrize("chunks", [1, 37])
+def test_sliding_rms_after_large_burst(tail, chunks):
+    # Голям импулс, последван от слаб сигнал: грешката в текущата сума на x²
+    # не бива да дава NaN или грешен RMS за прозорци само с опашката
+    window = 100
+    rng = np.random.default_rng(0)
+    x = np.concatenate((rng.normal(0, 1e4, 1000), np.full(3000, tail)))
+    rms = SlidingRMS(window)
+    y = np.concatenate([rms.process(part) for part in np.array_split(x, chunks)])
+    assert not np.isnan(y).any()
+    np.testing.assert_allclose(y[1000 + window:], tail, rtol=1e-6, atol=1e-12)
@@ -0,0 +1,289 @@
+import numpy as np
+
+# --- Интервали около моментите на отпушване ---
+def trigger_windows(trigger_times, fs, window_ms=1, start=0):
+    """
+    trigger_times: моменти на отпушване (s)
+    fs: честота на дискретизация (Hz)
+    window_ms: ширина на прозореца след всеки момент (ms)
+    start: номер на пробата, от която се броят индексите (за парчета от запис)
+    Връща (starts, ends) в проби – [start, end) за всеки момент, както в цикъла
+    start = int(t * fs), end = start + int(window_ms * fs / 1000).
+    """
+    starts = (np.asarray(trigger_times, dtype=float) * fs).astype(np.int64) - start
+    return starts, starts + int(window_ms * fs / 1000)
+
+def periodic_triggers(start, n, fs, rate=100.0, offset=0.0, window_ms=1):
+    """
+    Моментите offset + k / rate (s), чиито прозорци засягат пробите [start, start + n).
+    Стойностите са като на np.arange(offset, ..., 1 / rate), така че парче по
+    парче дават същите маски като целият масив наведнъж.
+    """
+    # С една проба резерв от двете страни: int(t * fs) може да се закръгли към
+    # съседното парче; излишните моменти отпадат при изрязването на маската
+    t0 = (start - 1) / fs - window_ms / 1000
+    t1 = (start + n + 1) / fs
+    step = 1 / rate
+    first = max(int(np.floor((t0 - offset) / step)), 0)
+    last = max(int(np.ceil((t1 - offset) / step)), first)
+    return offset + np.arange(first, last) * step
+
+def triggers_in_range(trigger_times, start, n, fs, window_ms=1):
+    """
+    От сортиран масив моменти (s) – тези, чиито прозорци засягат пробите [start, start + n).
+    """
+    t0 = (start - 1) / fs - window_ms / 1000
+    t1 = (start + n + 1) / fs
+    return trigger_times[np.searchsorted(trigger_times, t0):np.searchsorted(trigger_times, t1)]
+
+def merge_intervals(starts, ends):
+    """
+    Обединява припокриващи се и допиращи се интервали [start, end).
+    Връща (starts, ends), сортирани и без припокриване.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    if len(starts) == 0:
+        return starts.copy(), ends.copy()
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    ends = np.maximum.accumulate(ends[order])
+    # Нов интервал започва, където началото е след края на всичко досега
+    new_run = np.empty(len(starts), dtype=bool)
+    new_run[0] = True
+    new_run[1:] = starts[1:] > ends[:-1]
+    run_ends = np.append(np.flatnonzero(new_run)[1:] - 1, len(starts) - 1)
+    return starts[new_run], ends[run_ends]
+
+def interval_mask(starts, ends, n):
+    """
+    Булева маска с дължина n, True вътре в интервалите (изрязани до [0, n)).
+    Интервалите могат да се припокриват.
+    """
+    starts, ends = merge_intervals(np.clip(starts, 0, n), np.clip(ends, 0, n))
+    delta = np.zeros(n + 1, dtype=np.int8)
+    delta[starts] += 1
+    delta[ends] -= 1
+    return np.cumsum(delta[:n], dtype=np.int8).view(bool)  # Интервалите не се припокриват -> 0 или 1
+
+def triac_mask(trigger_times, fs, n, window_ms=1, as_runs=False, start=0):
+    """
+    Маска на засегнатите проби за всички моменти наведнъж.
+    n: дължина на сигнала в проби
+    as_runs: False -> булева маска (n,); True -> (starts, ends) на обединените интервали
+    start: номер на първата проба (маска за парчето [start, start + n) от запис);
+           моменти извън парчето се пропускат, а прозорци през границата се изрязват
+    """
+    starts, ends = trigger_windows(trigger_times, fs, window_ms, start)
+    if as_runs:
+        return merge_intervals(np.clip(starts, 0, n), np.clip(ends, 0, n))
+    return interval_mask(starts, ends, n)
+
+def mask_triac_spikes(sig, trigger_times, fs, window_ms=1, start=0):
+    """
+    Като mask_triac_spikes в meas11/meas12, но без цикъл по моментите:
+    връща копие на сигнала с NaN в засегнатите проби.
+    start: номер на първата проба на sig, когато sig е парче от по-дълъг запис
+    """
+    masked = np.array(sig, dtype=float)
+    masked[..., triac_mask(trigger_times, fs, masked.shape[-1], window_ms, start=start)] = np.nan
+    return masked
+
+def add_triac_spikes(sig, trigger_times, fs, spike_width_ms=1, spike_amp=5, rng=None):
+    """
+    Добавя (на място) шумови импулси с амплитуда spike_amp след всеки момент.
+    rng: numpy.random.Generator; None -> нов генератор без фиксирано начало
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    starts, _ = trigger_windows(trigger_times, fs, spike_width_ms)
+    width = int(spike_width_ms * fs / 1000)
+    index = (starts[:, np.newaxis] + np.arange(width)).ravel()
+    index = index[(index >= 0) & (index < len(sig))]
+    # np.add.at натрупва и при припокриващи се импулси, както последователният цикъл
+    np.add.at(sig, index, spike_amp * rng.standard_normal(len(index)))
+    return sig
+
+# --- Попълване на липсващи проби (NaN) само в празнините ---
+def nan_runs(nan):
+    """
+    nan: булева маска
+    Връща (starts, ends) на поредиците от True, [start, end).
+    """
+    edges = np.diff(np.concatenate(([0], nan.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _fill_runs(x, nan, kind):
+    """
+    Попълва на място всички NaN поредици в x, които имат валидна проба вдясно.
+    Поредица в началото (без съсед вляво) се екстраполира линейно от първата
+    валидна проба и следващата, ако и тя е валидна; иначе се попълва с
+    постоянната стойност на първата валидна проба. kind='cubic' използва по
+    два съседа от всяка страна (кубичен полином на Лагранж), когато са
+    налични и валидни; иначе – линейно.
+    Работата е пропорционална на броя NaN проби, без копия на целия сигнал.
+    """
+    starts, ends = nan_runs(nan)
+    keep = ends < len(x)
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return
+
+    if starts[0] == 0:
+        r = ends[0]
+        slope = x[r + 1] - x[r] if r + 1 < len(x) and not nan[r + 1] else 0.0
+        x[:r] = x[r] - slope * np.arange(r, 0, -1)
+        starts, ends = starts[1:], ends[1:]
+        if len(starts) == 0:
+            return
+
+    lengths = ends - starts
+    left = np.repeat(starts - 1, lengths)
+    right = np.repeat(ends, lengths)
+    index = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    position = (index - left) / (right - left)
+    values = x[left] + (x[right] - x[left]) * position
+
+    if kind == 'cubic':
+        outer_left = starts - 2
+        outer_right = ends + 1
+        ok = (outer_left >= 0) & (outer_right < len(x))
+        ok[ok] &= ~nan[outer_left[ok]] & ~nan[outer_right[ok]]
+        ok = np.repeat(ok, lengths)
+        if ok.any():
+            # Възли l-1, l, r, r+1; интерполация на Лагранж в точките index
+            nodes = np.stack((left - 1, left, right, right + 1))[:, ok]
+            t = index[ok]
+            cubic = np.zeros(len(t))
+            for j in range(4):
+                basis = np.ones(len(t))
+                for m in range(4):
+                    if m != j:
+                        basis *= (t - nodes[m]) / (nodes[j] - nodes[m])
+                cubic += basis * x[nodes[j]]
+            values[ok] = cubic
+
+    x[index] = values
+
+class GapFiller:
+    """
+    Попълва липсващите проби (NaN) на поток от парчета само в празнините,
+    на място, вместо интерполатор по целия сигнал. Равномерна дискретизация.
+    Празнина в края на парче се задържа, докато следващото парче даде десния ѝ
+    съсед (при 'cubic' – и пробата след него), затова process() може да върне
+    малко по-малко проби, а flush() – остатъка. Празнините в началото и в края
+    се екстраполират линейно от крайната валидна проба и съседната ѝ, а ако
+    съседната липсва – задържат стойността на крайната. Резултатът не зависи
+    от разделянето.
+    """
+
+    def __init__(self, kind='linear'):
+        """
+        kind: 'linear' или 'cubic'
+        """
+        if kind not in ('linear', 'cubic'):
+            raise ValueError(f"Непознат вид интерполация: {kind}")
+        self.kind = kind
+        self.reset()
+
+    def reset(self):
+        self._context = np.empty(0)  # Последните (до 2) изходни проби, NaN където са били липсващи
+        self._pending = np.empty(0)  # Задържана празнина от края на предишното парче
+
+    @property
+    def pending(self):
+        """Брой задържани проби (излизат в началото на следващия изход или при flush)."""
+        return len(self._pending)
+
+    def process(self, chunk):
+        """
+        chunk: следващото парче (1-D); ако е float масив, се попълва на място
+        Връща готовите проби – обикновено изглед към chunk.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        nan = np.isnan(chunk)
+        valid = np.flatnonzero(~nan)
+        if len(valid) == 0:
+            self._pending = np.concatenate((self._pending, chunk))
+            return chunk[:0]
+        first, last = valid[0], valid[-1]
+        if (len(self._context) == 0 and first == last == len(chunk) - 1
+                and (first > 0 or len(self._pending))):
+            # Празнина в началото на потока се екстраполира от първата валидна
+            # проба и следващата – задържа се, докато не дойде и тя
+            self._pending = np.concatenate((self._pending, chunk))
+            return chunk[:0]
+        if last >= 1:
+            after_gap = nan[last - 1]
+        else:
+            after_gap = len(self._pending) > 0 and np.isnan(self._pending[-1])
+        if self.kind == 'cubic' and last == len(chunk) - 1 and after_gap:
+            # Последната проба е десен съсед на празнина, а кубичната интерполация
+            # иска и пробата след нея – празнината се задържа заедно с нея
+            if len(valid) == 1:
+                self._pending = np.concatenate((self._pending, chunk))
+                return chunk[:0]
+            last = valid[-2]
+
+        # Празнина на границата – в началото на парчето (заедно със задържаната)
+        # или от проба 1 – зависи от контекста отляво; тя се попълва в малък
+        # работен масив, а останалите – направо в парчето
+        edge = first
+        if first == 0 and len(valid) > 1 and nan[1] and valid[1] <= last:
+            edge = valid[1]
+        head = None
+        if len(self._pending) or edge > 0:
+            tail = chunk[:min(edge + 2, last + 1)]
+            ext = np.concatenate((self._context, self._pending, tail))
+            ext_nan = np.isnan(ext)
+            _fill_runs(ext, ext_nan, self.kind)
+            offset = len(self._context) + len(self._pending)
+            chunk[:edge] = ext[offset:offset + edge]
+            if len(self._pending):
+                head = ext[offset - len(self._pending):offset]
+
+        body = chunk[edge:last + 1]
+        _fill_runs(body, nan[edge:last + 1], self.kind)
+        out = chunk[:last + 1]
+        if head is not None:
+            out = np.concatenate((head, out))
+
+        # Контекст: последната проба е валидна, предпоследната – NaN ако е била липсваща
+        if last >= 1:
+            second = np.nan if nan[last - 1] else chunk[last - 1]
+        elif len(self._pending):
+            second = self._pending[-1]  # Оригиналната стойност (NaN, ако е липсвала)
+        else:
+            second = self._context[-1] if len(self._context) else np.nan
+        self._context = np.array([second, chunk[last]])
+        self._pending = chunk[last + 1:].copy()
+        return out
+
+    def flush(self):
+        """
+        Връща задържаните проби и започва нов поток. Празнина в края се
+        екстраполира от последните две проби, ако и двете са валидни; иначе
+        се попълва с последната валидна стойност.
+        """
+        out = np.concatenate((self._context, self._pending))
+        nan = np.isnan(out)
+        valid = np.flatnonzero(~nan)
+        if len(self._pending) and len(valid):
+            _fill_runs(out, nan, self.kind)
+            last = valid[-1]
+            slope = out[last] - out[last - 1] if last >= 1 and not nan[last - 1] else 0.0
+            out[last + 1:] = out[last] + slope * np.arange(1, len(out) - last)
+        # Без нито една валидна проба няма от какво да се попълни – остават NaN
+        out = out[len(self._context):]
+        self.reset()
+        return out
+
+def fill_gaps(sig, kind='linear'):
+    """
+    Попълва NaN в целия сигнал на място (виж GapFiller) и го връща.
+    """
+    filler = GapFiller(kind)
+    out = filler.process(sig)
+    rest = filler.flush()
+    if len(rest):
+        sig[len(out):] = rest
+    return sig